@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark notification email rendering and delivery without a mail server.
+
+Renders one email per synthetic recipient with the original MIMEMultipart
+builder and with the precompiled templates, then delivers the compiled
+messages into a throwaway mbox and Maildir (or any EMAIL_TRANSPORT spec
+passed with --transport).
+
+Usage: python benchmarks/bench_email.py [--recipients 10000] [--transport maildir:/tmp/mail]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+# Add the API directory to Python path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_matcher import make_grid
+from email_service import FROM_EMAIL, deliver_shift_notification
+from email_templates import render_notification
+from email_transport import transport_from_spec
+
+
+def make_notifications(recipient_count, max_matches=5, seed=0):
+    """(to_email, user_name, matches) for each synthetic recipient"""
+    rng = random.Random(seed)
+    shifts = [(day_data, shift) for day_data in make_grid(seed=seed) for shift in day_data["shifts"]]
+    notifications = []
+    for recipient in range(recipient_count):
+        matches = []
+        for day_data, shift in rng.sample(shifts, rng.randint(1, max_matches)):
+            matches.append({
+                "day": day_data["day"],
+                "date": day_data["date"],
+                "shift": shift,
+                "matched_preference": {
+                    "id": recipient, "shift_type": shift.description.split()[0],
+                    "days": [day_data["day"]], "time_range_start": "00:00", "time_range_end": "23:59",
+                    "notification_email": f"user{recipient}@example.com"
+                }
+            })
+        notifications.append((f"user{recipient}@example.com", f"User {recipient}", matches))
+    return notifications
+
+def original_render(to_email, user_name, matches):
+    """The MIMEMultipart builder as it was before the compiled templates"""
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = f'Food Coop Shifts Available - {len(matches)} matches found!'
+    msg['From'] = FROM_EMAIL
+    msg['To'] = to_email
+    html_content = f"""
+    <html>
+    <body>
+        <h2>Hi {user_name}!</h2>
+        <p>Great news! We found {len(matches)} shift(s) that match your preferences:</p>
+        {''.join([
+            f'''
+            <div style="border: 1px solid #ccc; margin: 10px 0; padding: 15px; border-radius: 5px;">
+                <h3>{match["day"]} {match["date"]}</h3>
+                <p><strong>Time:</strong> {match["shift"].time}</p>
+                <p><strong>Description:</strong> {match["shift"].description}</p>
+                <p><strong>Sign up:</strong> <a href="{match["shift"].href}">Click here to sign up</a></p>
+                <p><em>Matched preference: {match["matched_preference"]["shift_type"]} on {", ".join(match["matched_preference"]["days"])}</em></p>
+            </div>
+            ''' for match in matches
+        ])}
+        <p>Don't wait too long - these shifts fill up quickly!</p>
+        <p>Best,<br>Food Coop Shift Notification System</p>
+    </body>
+    </html>
+    """
+    text_content = f"""
+Hi {user_name}!
+
+Great news! We found {len(matches)} shift(s) that match your preferences:
+
+{''.join([
+    f'''
+{match["day"]} {match["date"]}
+Time: {match["shift"].time}
+Description: {match["shift"].description}
+Sign up: {match["shift"].href}
+Matched preference: {match["matched_preference"]["shift_type"]} on {", ".join(match["matched_preference"]["days"])}
+
+''' for match in matches
+])}
+
+Don't wait too long - these shifts fill up quickly!
+
+Best,
+Food Coop Shift Notification System
+    """
+    msg.attach(MIMEText(text_content, 'plain'))
+    msg.attach(MIMEText(html_content, 'html'))
+    return msg.as_bytes()
+
+def timed(label, count, fn):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32}{elapsed * 1000:>10.1f} ms{count / elapsed:>12.0f} emails/s")
+    return elapsed
+
+def deliver_all(notifications, transport):
+    for to_email, user_name, matches in notifications:
+        deliver_shift_notification(to_email, user_name, matches, transport=transport)
+    transport.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark notification email render and delivery")
+    parser.add_argument("--recipients", type=int, default=10000)
+    parser.add_argument("--max-matches", type=int, default=5, help="most matches per email")
+    parser.add_argument("--transport", help="EMAIL_TRANSPORT spec to deliver to instead of a temporary mbox and Maildir")
+    args = parser.parse_args()
+
+    notifications = make_notifications(args.recipients, args.max_matches)
+    count = len(notifications)
+    print(f"{count} recipients, up to {args.max_matches} matches each")
+
+    original = timed("render: MIMEMultipart", count, lambda: [original_render(*n) for n in notifications])
+    compiled = timed("render: compiled templates", count, lambda: [render_notification(*n, FROM_EMAIL) for n in notifications])
+    print(f"render speedup: {original / compiled:.1f}x")
+
+    if args.transport:
+        timed(f"render + send: {args.transport}", count, lambda: deliver_all(notifications, transport_from_spec(args.transport)))
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        for spec in (f"mbox:{directory}/notifications.mbox", f"maildir:{directory}/Maildir"):
+            timed(f"render + send: {spec.split(':')[0]}", count, lambda: deliver_all(notifications, transport_from_spec(spec)))
+
+if __name__ == '__main__':
+    main()
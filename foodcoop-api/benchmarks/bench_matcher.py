@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark preference matching: the original users x preferences x days x
+shifts loop against the compiled PreferenceIndex and, when NumPy is
+installed, its vectorized backend.
+
+Preferences are synthetic in-memory objects (no database needed). Their days
+use the grid's abbreviations ("Mon") so the original loop, which compares day
+names literally, finds the same matches as the index.
+
+Usage: python benchmarks/bench_matcher.py [--users 10000] [--preferences 50000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+# Add the API directory to Python path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from preference_index import PreferenceIndex, numpy
+from sample_pages import generate_week
+from shift_record import deserialize_days
+from shift_times import is_time_in_range
+
+SHIFT_TYPES = [
+    "Stocking", "Lifting", "Cashier", "Checkout", "Office", "Carrot", "Receiving",
+    "Food Processing", "Cleaning", "Entrance Desk", "Inventory", "Dairy", "Produce",
+    "Soup Kitchen", "Cheese", "Team Leader", "Bulk", "Cart Return",
+]
+DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+TIME_RANGES = [("06:00", "12:00"), ("08:00", "14:00"), ("12:00", "18:00"), ("17:00", "22:00"), ("00:00", "23:59")]
+
+
+def make_grid(weeks=2, density=0.5, seed=0):
+    """Day dicts of ShiftRecords shaped like get_open_shifts_next_2_weeks() output"""
+    rng = random.Random(seed)
+    grid = []
+    start = date(2025, 3, 16)
+    for week in range(weeks):
+        for day, shifts in generate_week(start + timedelta(days=7 * week), density, rng):
+            grid.append({
+                "day": day.strftime('%a'),
+                "date": f"{day.month}/{day.day}/{day.year}",
+                "shifts": [
+                    {"time": time, "description": description, "href": f"https://members.foodcoop.com/services/shift_claim/{shift_id}/"}
+                    for shift_id, time, description in shifts
+                ]
+            })
+    return deserialize_days(grid)
+
+def make_users(user_count, preference_count, seed=0):
+    rng = random.Random(seed)
+    users = []
+    for user_id in range(1, user_count + 1):
+        users.append(SimpleNamespace(
+            id=user_id, name=f"User {user_id}", email=f"user{user_id}@example.com",
+            notification_email=f"user{user_id}@example.com", shift_preferences=[]
+        ))
+    for preference_id in range(1, preference_count + 1):
+        user = users[rng.randrange(user_count)]
+        start, end = rng.choice(TIME_RANGES)
+        user.shift_preferences.append(SimpleNamespace(
+            id=preference_id,
+            shift_type=rng.choice(SHIFT_TYPES),
+            days=rng.sample(DAYS, rng.randint(1, 3)),
+            time_range_start=start,
+            time_range_end=end,
+            notification_email=user.notification_email,
+            is_active=True,
+            already_emailed=False
+        ))
+    return users
+
+def original_loop(users, open_shifts):
+    """The matcher as it was before PreferenceIndex, re-parsing each shift's strings"""
+    matches = []
+    for user in users:
+        user_matches = []
+        for preference in user.shift_preferences:
+            if not preference.is_active or preference.already_emailed:
+                continue
+            for day_data in open_shifts:
+                day_name = day_data["day"]
+                if day_name in preference.days:
+                    for shift in day_data["shifts"]:
+                        if preference.shift_type.lower() in shift.description.lower():
+                            if is_time_in_range(shift.time, preference.time_range_start, preference.time_range_end):
+                                user_matches.append({
+                                    "day": day_name,
+                                    "date": day_data["date"],
+                                    "shift": shift,
+                                    "matched_preference": {
+                                        "id": preference.id,
+                                        "shift_type": preference.shift_type,
+                                        "days": preference.days,
+                                        "time_range_start": preference.time_range_start,
+                                        "time_range_end": preference.time_range_end,
+                                        "notification_email": preference.notification_email
+                                    }
+                                })
+        if user_matches:
+            matches.append({
+                "user": {"id": user.id, "name": user.name, "email": user.email, "notification_email": user.notification_email},
+                "matches": user_matches
+            })
+    return matches
+
+def timed(label, fn):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28}{elapsed * 1000:>10.1f} ms")
+    return result, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark preference matching")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--preferences", type=int, default=50000)
+    parser.add_argument("--density", type=float, default=0.5, help="how full the shift grid is")
+    args = parser.parse_args()
+
+    open_shifts = make_grid(density=args.density)
+    users = make_users(args.users, args.preferences)
+    shift_count = sum(len(day_data["shifts"]) for day_data in open_shifts)
+    print(f"{args.users} users, {args.preferences} preferences, {shift_count} shifts over {len(open_shifts)} days")
+
+    expected, original_seconds = timed("original loop", lambda: original_loop(users, open_shifts))
+    index, build_seconds = timed("build PreferenceIndex", lambda: PreferenceIndex.from_users(users))
+    matches, match_seconds = timed("match with index", lambda: index.match(open_shifts))
+
+    if matches != expected:
+        print("PreferenceIndex matches differ from the original loop")
+        sys.exit(1)
+
+    vectorized_seconds = None
+    if numpy is not None:
+        index.backend = 'numpy'
+        vectorized, vectorized_seconds = timed("match with numpy backend", lambda: index.match(open_shifts))
+        if vectorized != expected:
+            print("NumPy backend matches differ from the original loop")
+            sys.exit(1)
+
+    match_count = sum(len(user_match["matches"]) for user_match in matches)
+    print(f"{match_count} matches for {len(matches)} users, identical to the original loop")
+    print(f"speedup: {original_seconds / (build_seconds + match_seconds):.1f}x including index build, "
+          f"{original_seconds / match_seconds:.1f}x matching only")
+    if vectorized_seconds is not None:
+        print(f"numpy backend: {original_seconds / vectorized_seconds:.1f}x matching only")
+
+if __name__ == '__main__':
+    main()
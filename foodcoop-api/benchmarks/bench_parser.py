@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shift grid parser backends against saved sample pages.
+
+Every backend is checked to produce exactly the html.parser output before it
+is timed. Drop real saved pages into benchmarks/samples/ to benchmark them too.
+
+Usage: python benchmarks/bench_parser.py [--repeat 50]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+# Add the API directory to Python path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shift_parser import available_backends, parse_shifts_page
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'samples')
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shift grid parsers")
+    parser.add_argument("--repeat", type=int, default=50, help="parses per page and backend")
+    args = parser.parse_args()
+
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(SAMPLES_DIR, '*.html'))):
+        with open(path) as f:
+            pages[os.path.basename(path)] = f.read()
+
+    backends = available_backends()
+    print(f"{'page':<24}{'size':>9}" + ''.join(f'{name:>14}' for name in backends))
+    for name, html_content in pages.items():
+        expected = parse_shifts_page(html_content, backend='html.parser')
+        timings = []
+        for backend in backends:
+            if parse_shifts_page(html_content, backend=backend) != expected:
+                print(f"{name}: {backend} output differs from html.parser")
+                sys.exit(1)
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                parse_shifts_page(html_content, backend=backend)
+            timings.append((time.perf_counter() - start) / args.repeat * 1000)
+
+        print(f"{name:<24}{len(html_content):>9}" + ''.join(f'{ms:>11.2f} ms' for ms in timings))
+
+if __name__ == '__main__':
+    main()
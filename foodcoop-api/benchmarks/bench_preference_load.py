@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark loading preferences for matching: the old distinct user join with
+lazily loaded user.shift_preferences against active_preference_rows().
+
+Seeds synthetic users and preferences into DATABASE_URL (PostgreSQL) inside
+a transaction that is rolled back at the end, counts the SQL statements each
+loader runs and fails if the streamed loader needs more than one.
+
+Usage: DATABASE_URL=postgresql://... python benchmarks/bench_preference_load.py [--users 10000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the API directory to Python path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event, func
+from app import app
+from bench_matcher import make_users
+from models import db, ShiftPreference, User
+from preference_index import PreferenceIndex
+from routes.shifts import active_preference_rows
+from shift_times import days_mask, time_to_minutes
+
+
+class QueryCounter:
+    """Counts statements executed on an engine while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+def seed(user_count, preference_count):
+    """Bulk insert synthetic users and preferences, returning the user ID offset"""
+    offset = (db.session.query(func.max(User.id)).scalar() or 0) + 1_000_000
+    users = make_users(user_count, preference_count)
+    db.session.execute(db.insert(User), [
+        {
+            'id': offset + user.id, 'email': f'bench{offset + user.id}@example.com', 'name': user.name,
+            'password': 'x', 'notification_email': user.notification_email, 'is_active': True
+        }
+        for user in users
+    ])
+    db.session.execute(db.insert(ShiftPreference), [
+        {
+            'user_id': offset + user.id, 'shift_type': preference.shift_type, 'days': preference.days,
+            'time_range_start': preference.time_range_start, 'time_range_end': preference.time_range_end,
+            'notification_email': preference.notification_email, 'is_active': True,
+            'days_mask': days_mask(preference.days),
+            'start_minute': time_to_minutes(preference.time_range_start),
+            'end_minute': time_to_minutes(preference.time_range_end)
+        }
+        for user in users for preference in user.shift_preferences
+    ])
+    db.session.expunge_all()
+
+def lazy_load():
+    """The loader as it was: distinct user join, then one query per user"""
+    users = db.session.query(User).join(ShiftPreference).filter(
+        User.is_active == True,
+        User.deleted_at.is_(None),
+        ShiftPreference.is_active == True
+    ).distinct().all()
+    return PreferenceIndex.from_users(users)
+
+def streamed_load():
+    return PreferenceIndex.from_rows(active_preference_rows())
+
+def timed(label, fn):
+    with QueryCounter(db.engine) as counter:
+        started = time.perf_counter()
+        index = fn()
+        elapsed = time.perf_counter() - started
+    print(f"{label:<20}{elapsed * 1000:>10.1f} ms{counter.count:>8} queries{len(index.preferences):>9} preferences")
+    db.session.expunge_all()
+    return index, counter.count
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark preference loading for matching")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--preferences", type=int, default=50000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        try:
+            seed(args.users, args.preferences)
+            lazy_index, _ = timed("lazy relationship", lazy_load)
+            streamed_index, streamed_queries = timed("streamed rows", streamed_load)
+        finally:
+            db.session.rollback()
+
+    if streamed_queries != 1:
+        print(f"Streamed loader ran {streamed_queries} queries, expected 1")
+        sys.exit(1)
+    if sorted(p.id for p in lazy_index.preferences) != sorted(p.id for p in streamed_index.preferences):
+        print("Loaders indexed different preferences")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
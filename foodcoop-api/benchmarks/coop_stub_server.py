@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for members.foodcoop.com.
+
+Implements the CSRF login flow and serves synthetic (or recorded) shift grid
+pages under /services/shifts/{week}/{committee}/0/{date}, with configurable
+latency, error rate and shift density. Point the API at it with
+COOP_BASEURL=http://127.0.0.1:8765.
+
+Usage: python benchmarks/coop_stub_server.py [--port 8765] [--latency 0.2] ...
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Add the API directory to Python path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from committees import ALL_COMMITTEES, committee_id_for_description
+from sample_pages import generate_week, render_page
+
+LOGIN_PATH = '/services/login/'
+SHIFTS_PATTERN = re.compile(r'^/services/shifts/(\d+)/(\d+)/0/(\d{4}-\d{2}-\d{2})/?$')
+LOGIN_FORM = """<html><body><form method="post" action="/services/login/">
+<input type="hidden" name="csrfmiddlewaretoken" value="{csrf_token}">
+<input name="username"><input name="password" type="password">
+<input type="submit" name="submit" value="Log In">
+</form></body></html>"""
+
+
+class StubConfig:
+    """Behaviour knobs shared by all request handlers"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, density=0.5,
+                 churn_seconds=0, session_ttl=0, replay_dir=None, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.density = density
+        self.churn_seconds = churn_seconds
+        self.session_ttl = session_ttl
+        self.replay_pages = sorted(glob.glob(os.path.join(replay_dir, '*.html'))) if replay_dir else []
+        self.seed = seed
+        self.sessions = {}  # sessionid -> created timestamp
+        self.lock = threading.Lock()
+        self.counters = {'logins': 0, 'pages': 0, 'not_modified': 0, 'errors': 0, 'login_redirects': 0}
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def grid_version(self):
+        """Changes every churn_seconds so the grid looks like it's being claimed"""
+        return int(time.time() // self.churn_seconds) if self.churn_seconds else 0
+
+
+def make_handler(config):
+    class CoopStubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output readable
+
+        def cookies(self):
+            cookie = SimpleCookie(self.headers.get('Cookie', ''))
+            return {name: morsel.value for name, morsel in cookie.items()}
+
+        def send(self, status, body='', headers=None):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                if isinstance(value, list):
+                    for item in value:
+                        self.send_header(name, item)
+                else:
+                    self.send_header(name, value)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def redirect(self, location, set_cookies=None):
+            self.send(302, '', {'Location': location, 'Set-Cookie': set_cookies or []})
+
+        def logged_in(self):
+            session_id = self.cookies().get('sessionid')
+            with config.lock:
+                created = config.sessions.get(session_id)
+            if created is None:
+                return False
+            return not config.session_ttl or time.time() - created < config.session_ttl
+
+        def simulate_network(self):
+            """Sleep for the configured latency. Returns False if this request should fail"""
+            delay = config.latency + random.uniform(0, config.jitter)
+            if delay:
+                time.sleep(delay)
+            return random.random() >= config.error_rate
+
+        def do_GET(self):
+            # The scraper sends its login form along with every GET; drain it
+            # so the next request on this keep-alive connection parses cleanly
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            path = urlparse(self.path).path
+            if path == LOGIN_PATH:
+                csrf_token = secrets.token_hex(32)
+                return self.send(200, LOGIN_FORM.format(csrf_token=csrf_token), {
+                    'Set-Cookie': f'csrftoken={csrf_token}; Path=/'
+                })
+
+            match = SHIFTS_PATTERN.match(path)
+            if not match:
+                return self.send(404, 'Not found')
+            if not self.logged_in():
+                config.count('login_redirects')
+                return self.redirect(f'{LOGIN_PATH}?next={path}')
+            if not self.simulate_network():
+                config.count('errors')
+                return self.send(503, 'Service unavailable')
+
+            week, committee_id, start = int(match.group(1)), int(match.group(2)), match.group(3)
+            # The grid only changes with the churn version, not with the per-request CSRF token
+            version = f'{week}:{committee_id}:{start}:{config.grid_version()}:{len(config.replay_pages)}'
+            etag = '"%s"' % hashlib.sha256(version.encode('utf-8')).hexdigest()[:32]
+            if self.headers.get('If-None-Match') == etag:
+                config.count('not_modified')
+                return self.send(304, '', {'ETag': etag})
+
+            body = self.shifts_page(week, committee_id, start)
+            config.count('pages')
+            self.send(200, body, {'ETag': etag})
+
+        def do_POST(self):
+            if urlparse(self.path).path != LOGIN_PATH:
+                return self.send(404, 'Not found')
+
+            length = int(self.headers.get('Content-Length', 0))
+            form = {name: values[0] for name, values in parse_qs(self.rfile.read(length).decode('utf-8')).items()}
+            csrf_cookie = self.cookies().get('csrftoken')
+            if not csrf_cookie or form.get('csrfmiddlewaretoken') != csrf_cookie:
+                return self.send(403, 'CSRF verification failed')
+            if not form.get('username') or not form.get('password'):
+                return self.send(200, LOGIN_FORM.format(csrf_token=csrf_cookie))
+
+            session_id = secrets.token_hex(16)
+            with config.lock:
+                config.sessions[session_id] = time.time()
+            config.count('logins')
+            self.redirect('/services/', [f'sessionid={session_id}; Path=/; HttpOnly'])
+
+        def shifts_page(self, week, committee_id, start):
+            if config.replay_pages:
+                with open(config.replay_pages[week % len(config.replay_pages)]) as f:
+                    return f.read()
+
+            week_start = datetime.strptime(start, '%Y-%m-%d').date() + timedelta(days=7 * week)
+            rng = random.Random(f'{config.seed}:{week_start}:{config.grid_version()}')
+            days = generate_week(week_start, config.density, rng)
+            if committee_id != ALL_COMMITTEES:
+                days = [
+                    (day, [shift for shift in shifts if committee_id_for_description(shift[2]) == committee_id])
+                    for day, shifts in days
+                ]
+            return render_page(days, csrf_token=secrets.token_hex(32))
+
+    return CoopStubHandler
+
+
+def start_server(config, host='127.0.0.1', port=0):
+    """Start the stub in a background thread. Returns (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+def add_config_arguments(parser):
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every page")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra seconds per page")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of pages answered with 503")
+    parser.add_argument("--density", type=float, default=0.5, help="how full the shift grid is")
+    parser.add_argument("--churn-seconds", type=int, default=0, help="regenerate the grid this often (0 = static)")
+    parser.add_argument("--session-ttl", type=int, default=0, help="expire logins after this many seconds")
+    parser.add_argument("--replay-dir", help="serve recorded pages from this directory instead")
+
+def config_from_arguments(args):
+    return StubConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        density=args.density,
+        churn_seconds=args.churn_seconds,
+        session_ttl=args.session_ttl,
+        replay_dir=args.replay_dir
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Local coop site stand-in")
+    parser.add_argument("--host", default='127.0.0.1')
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    config = config_from_arguments(args)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config))
+    server.daemon_threads = True
+    print(f"Coop stub listening on http://{args.host}:{args.port} (COOP_BASEURL)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"Served: {config.counters}")
+
+if __name__ == '__main__':
+    main()
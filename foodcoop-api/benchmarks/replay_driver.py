@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+End-to-end check latency and throughput against the local coop stand-in.
+
+Starts benchmarks/coop_stub_server.py in-process (or uses --base-url), points
+COOP_BASEURL at it and runs checks back to back.
+
+Modes:
+    scrape   - check_all_shifts() on the shared, persisted coop session
+    login    - log in on a fresh session, then scrape (a cold check)
+    pipeline - the full check_shifts_cron.main() run (needs DATABASE_URL)
+
+Usage: python benchmarks/replay_driver.py --mode scrape --iterations 50 --latency 0.2
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the API directory to Python path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from coop_stub_server import add_config_arguments, config_from_arguments, start_server
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def make_check(mode):
+    """Import the API after COOP_BASEURL is set and return the function to time"""
+    if mode == 'pipeline':
+        import check_shifts_cron
+        return check_shifts_cron.main
+
+    from coop_session import CoopSession
+    from routes.shifts import check_all_shifts, get_open_shifts_next_2_weeks
+
+    if mode == 'login':
+        def cold_check():
+            session = CoopSession(os.environ['COOP_USERNAME'], os.environ['COOP_PASSWORD'])
+            session.login()
+            return get_open_shifts_next_2_weeks(session, session.login_data, session.login_headers)
+        return cold_check
+
+    return check_all_shifts
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shift checks against the coop stand-in")
+    parser.add_argument("--mode", choices=['scrape', 'login', 'pipeline'], default='scrape')
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1, help="checks running at once")
+    parser.add_argument("--base-url", help="use an already running stub instead of starting one")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    config = None
+    base_url = args.base_url
+    if not base_url:
+        config = config_from_arguments(args)
+        _, base_url = start_server(config)
+
+    os.environ['COOP_BASEURL'] = base_url
+    os.environ.setdefault('COOP_USERNAME', 'benchmark')
+    os.environ.setdefault('COOP_PASSWORD', 'benchmark')
+    os.environ['COOP_STATE_DIR'] = tempfile.mkdtemp(prefix='coop-bench-')
+    check = make_check(args.mode)
+
+    def timed_check(_):
+        started = time.perf_counter()
+        check()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        latencies = list(executor.map(timed_check, range(args.iterations)))
+    elapsed = time.perf_counter() - started
+
+    print()
+    print(f"mode={args.mode} iterations={args.iterations} concurrency={args.concurrency} base_url={base_url}")
+    print(f"latency p50={percentile(latencies, 50) * 1000:.1f} ms "
+          f"p90={percentile(latencies, 90) * 1000:.1f} ms "
+          f"p99={percentile(latencies, 99) * 1000:.1f} ms "
+          f"max={max(latencies) * 1000:.1f} ms")
+    print(f"throughput={args.iterations / elapsed:.2f} checks/s")
+    if config:
+        print(f"stub: {config.counters}")
+
+if __name__ == '__main__':
+    main()
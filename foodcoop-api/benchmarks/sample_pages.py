@@ -0,0 +1,123 @@
+"""
+Synthetic coop shift grid pages.
+
+The markup mirrors members.foodcoop.com/services/shifts/: a page chrome with
+navigation and a CSRF-protected logout form, then a div.grid-container with
+one div.col per day holding a.shift links.
+"""
+
+import random
+from datetime import date, timedelta
+from html import escape
+
+DESCRIPTIONS = [
+    "🥕 Carrot 🥕",
+    "Receiving: Lifting 🚚",
+    "Receiving: Stocking 📦",
+    "Cart Return and Sidewalk Maintenance 🛒",
+    "** Cashier 💵",
+    "Checkout 💳",
+    "Cleaning 🏝",
+    "Entrance Desk 🎟",
+    "Food Processing: Bulk Packaging & Stocking 🍿",
+    "Food Processing: Cheese & Olive Packaging 🧀",
+    "Inventory 📋",
+    "Office 📗",
+    "Receiving: Dairy Lifting 🥛",
+    "Receiving: Produce Processing 🥬",
+    "** Receiving: Team Leader 📦",
+    "Soup Kitchen: Food Services 🍲",
+]
+SHIFT_TIMES = [
+    "6:00 AM - 8:45 AM",
+    "8:00 AM - 10:45 AM",
+    "10:30 AM - 1:15 PM",
+    "12:30 PM - 3:15 PM",
+    "2:45 PM - 5:30 PM",
+    "5:00 PM - 7:45 PM",
+    "7:30 PM - 10:15 PM",
+]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Shifts | Park Slope Food Coop</title>
+<link rel="stylesheet" href="/static/css/main.css">
+<script src="/static/js/jquery.min.js"></script>
+</head>
+<body>
+<div class="header">
+  <ul class="nav">
+    <li><a href="/services/">Home</a></li>
+    <li><a href="/services/shifts/">Shift calendar</a></li>
+    <li><a href="/services/my_shifts/">My shifts</a></li>
+    <li><a href="/services/my_account/">My account</a></li>
+  </ul>
+  <form method="post" action="/services/logout/">
+    <input type="hidden" name="csrfmiddlewaretoken" value="{csrf_token}">
+    <input type="submit" value="Log out">
+  </form>
+</div>
+<div class="content">
+<h1>Shift calendar</h1>
+<div class="grid-container">
+{columns}
+</div>
+</div>
+<div class="footer"><p>Park Slope Food Coop &middot; 782 Union Street</p></div>
+</body>
+</html>
+"""
+
+
+def render_column(day, shifts):
+    """Render one day column. shifts is a list of (shift_id, time, description)"""
+    heading = f'<p><b>{day.strftime("%a")}&nbsp;{day.month}/{day.day}/{day.year}</b></p>'
+    if not shifts:
+        return f'<div class="col">{heading}<p align="center">-- No shifts --</p></div>'
+
+    links = ''.join(
+        f'<a class="shift" href="/services/shift_claim/{shift_id}/"><b>{time}</b> {escape(description)}</a>'
+        for shift_id, time, description in shifts
+    )
+    return f'<div class="col">{heading}{links}</div>'
+
+def generate_week(start, density=0.5, rng=None):
+    """
+    Pick random shifts for the 7 days starting at start.
+
+    Returns a list of (day, shifts) where shifts is a list of
+    (shift_id, time, description). density is the chance each time slot
+    has an open shift for a given committee.
+    """
+    rng = rng or random.Random(0)
+    week = []
+    for offset in range(7):
+        day = start + timedelta(days=offset)
+        shifts = []
+        for slot, time in enumerate(SHIFT_TIMES):
+            for committee, description in enumerate(DESCRIPTIONS):
+                if rng.random() < density / len(DESCRIPTIONS) * 4:
+                    shift_id = int(day.strftime('%Y%m%d')) * 1000 + slot * 100 + committee
+                    shifts.append((shift_id, time, description))
+        week.append((day, shifts))
+    return week
+
+def render_page(week, csrf_token='x' * 64):
+    """Render a full grid page from generate_week() output"""
+    columns = '\n'.join(render_column(day, shifts) for day, shifts in week)
+    return PAGE_TEMPLATE.format(columns=columns, csrf_token=csrf_token)
+
+def synthetic_page(start=None, density=0.5, seed=0):
+    """A complete page for the week starting at start"""
+    return render_page(generate_week(start or date.today(), density, random.Random(seed)))
+
+
+if __name__ == '__main__':
+    # Regenerate the saved sample pages used by bench_parser.py
+    import os
+    samples_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'samples')
+    for name, density, seed in [('sparse', 0.03, 1), ('typical', 0.5, 2), ('dense', 2.0, 3)]:
+        with open(os.path.join(samples_dir, f'shifts_{name}.html'), 'w') as f:
+            f.write(synthetic_page(date(2025, 3, 16), density, seed))
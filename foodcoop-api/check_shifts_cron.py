@@ -18,63 +18,83 @@ load_dotenv()
 # Import Flask app and database
 from app import app
 from models import db
-from routes.shifts import check_all_users_shift_preferences
-from email_service import send_shift_notification_email
+from routes.shifts import check_all_users_shift_preferences, forget_last_check, COOP_INCREMENTAL_MATCH, NO_CHANGE
+from email_outbox import dispatch_pending, enqueue_notification
+from run_metrics import metrics
+
+# Drain the email outbox at the end of each run (off when a dispatcher runs separately)
+EMAIL_DISPATCH_INLINE = os.getenv('EMAIL_DISPATCH_INLINE', 'true').lower() == 'true'
 
 def main():
     """Main function to check shifts and send notifications"""
+    try:
+        run_check()
+    except Exception:
+        sys.exit(1)
+
+def run_check(dispatch=EMAIL_DISPATCH_INLINE):
+    """
+    Run one shift check and queue notifications.
+
+    Matches go to the email outbox together with their ledger entries; with
+    dispatch, the outbox is then drained before returning. Also used by
+    shift_daemon.py, which dispatches on its own thread and reads the run's
+    shifts_appeared and shifts_disappeared metrics to tell whether the grid
+    is changing.
+    """
     print(f"[{datetime.now()}] Starting shift check...")
+    metrics.reset()
     
     try:
         # Use Flask app context for database operations
         with app.app_context():
             # Get all matching shifts for all users
-            matches = check_all_users_shift_preferences()
-            
-            if not matches:
+            matches, checkpoint = check_all_users_shift_preferences(only_if_changed=True, incremental=COOP_INCREMENTAL_MATCH)
+
+            if matches is NO_CHANGE:
+                print(f"[{datetime.now()}] Shift pages and preferences unchanged since last check")
+            elif not matches:
                 print(f"[{datetime.now()}] No matching shifts found for any users")
-                return
-            
-            print(f"[{datetime.now()}] Found matches for {len(matches)} user(s)")
-            
-            # Send notifications for each user with matches
-            emails_sent = 0
-            for user_match in matches:
-                user = user_match['user']
-                user_matches = user_match['matches']
-                
-                # Use notification_email if set, otherwise use regular email
-                email_to_use = user['notification_email'] or user['email']
-                
-                if email_to_use:
-                    success = send_shift_notification_email(
-                        email_to_use,
-                        user['name'],
-                        user_matches
-                    )
-                    
-                    if success:
-                        emails_sent += 1
-                        print(f"[{datetime.now()}] Sent notification to {user['name']} ({email_to_use}) for {len(user_matches)} matches")
-                        
-                        # Mark all matched preferences as already_emailed
-                        from models import ShiftPreference
-                        for match in user_matches:
-                            preference_id = match['matched_preference']['id']
-                            preference = ShiftPreference.query.get(preference_id)
-                            if preference:
-                                preference.already_emailed = True
-                        db.session.commit()
-                    else:
-                        print(f"[{datetime.now()}] Failed to send notification to {user['name']} ({email_to_use})")
-                else:
-                    print(f"[{datetime.now()}] No email address found for user {user['name']}")
-            
-            print(f"[{datetime.now()}] Shift check completed. Sent {emails_sent} email(s)")
+            else:
+                print(f"[{datetime.now()}] Found matches for {len(matches)} user(s)")
+                queue_notifications(matches)
+            # Only now are the matches safe in the outbox
+            checkpoint.save()
+
+            if dispatch:
+                sent, failed = dispatch_pending()
+                print(f"[{datetime.now()}] Shift check completed. Sent {sent} email(s), {failed} failed and will be retried")
             
     except Exception as e:
         print(f"[{datetime.now()}] Error during shift check: {e}")
-        sys.exit(1)
+        forget_last_check()
+        raise
+    finally:
+        metrics.log()
+
+def queue_notifications(matches):
+    """
+    Write every recipient's matches to the outbox and the ledger in one transaction.
+
+    Users sharing a notification address get a single email between them.
+    """
+    recipients = {}  # address -> (user, names, matches)
+    for user_match in matches:
+        user = user_match['user']
+        # Use notification_email if set, otherwise use regular email
+        email_to_use = user['notification_email'] or user['email']
+        if not email_to_use:
+            print(f"[{datetime.now()}] No email address found for user {user['name']}")
+            continue
+        _, names, recipient_matches = recipients.setdefault(email_to_use.strip().lower(), (user, [], []))
+        if user['name'] not in names:
+            names.append(user['name'])
+        recipient_matches.extend(user_match['matches'])
+
+    for email_to_use, (user, names, recipient_matches) in recipients.items():
+        enqueue_notification({**user, 'name': ' & '.join(names)}, email_to_use, recipient_matches)
+    db.session.commit()
+    print(f"[{datetime.now()}] Queued notification email(s) for {len(recipients)} recipient(s)")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
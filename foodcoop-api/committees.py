@@ -0,0 +1,93 @@
+"""
+Coop committees (shift types) and their IDs in the shift calendar URLs.
+
+/services/shifts/{week}/{committee_id}/0/{date} lists only that committee's
+shifts; committee 0 lists every committee.
+"""
+
+ALL_COMMITTEES = 0
+
+SHIFT_MAPPING = {
+    "-- All committees' --": 0,
+    "🥕 Carrot 🥕": 7,
+    "Receiving: Lifting 🚚": 2,
+    "Receiving: Stocking 📦": 5,
+    "Bathroom Cleaning Plus 🚽": 110,
+    "Cart Return and Sidewalk Maintenance 🛒": 4,
+    "Case Maintenance 🧽": 1,
+    "** Cash Drawer Counting 💰": 114,
+    "** Cashier 💵": 38,
+    "Checkout 💳": 58,
+    "CHIPS Food Drive 🍛": 142,
+    "Cleaning Bulk Bins 🧼": 126,
+    "Cleaning 🏝": 78,
+    "** Enrollment Data Entry and Photo Processing ⌨️": 134,
+    "Entrance Desk 🎟": 54,
+    "Flex Worker 🥫": 56,
+    "Food Processing: Bulk Packaging & Stocking 🍿": 48,
+    "** Food Processing: Bulk Team Leader 🍿": 146,
+    "Food Processing: Cheese & Olive Packaging 🧀": 94,
+    "** Food Processing: Cheese & Olive Team Leader 🧀": 130,
+    "** Front End Support 👀": 64,
+    "General Meeting for workslot credit 🗳️": 159,
+    "Inventory 📋": 6,
+    "** Inventory: Data entry 🖥": 50,
+    "Inventory: Produce 🍀": 72,
+    "** Morning Set-up & Equipment Cleaning 🧺": 40,
+    "** New Member Enrollment 📃": 106,
+    "Office 📗": 62,
+    "** Receiving: Beer Stocking 🍺": 44,
+    "Receiving: Bread Stocking 🍞": 74,
+    "Receiving: Bulk Lifting 🫘": 174,
+    "Receiving: Dairy Lifting 🥛": 172,
+    "Receiving: Health and Beauty Support 🧴": 102,
+    "Receiving: Meat Processing and Lifting 🍖": 42,
+    "Receiving: Produce Lifting and Stocking 🥦": 150,
+    "Receiving: Produce Processing 🥬": 90,
+    "** Receiving: Team Leader 📦": 157,
+    "Receiving: Turkey Runner 🦃": 98,
+    "Receiving: Vitamins 🍬": 46,
+    "Repairs 🛠": 52,
+    "** Scanning Invoices 🖨": 3,
+    "Sorting and Collating Documents 🗂": 68,
+    "Soup Kitchen Volunteer Appreciation Event 🎉": 169,
+    "Soup Kitchen: Deep-Cleaning": 152,
+    "Soup Kitchen: Food Services 🍲": 86,
+    "Soup Kitchen: Guest Services ✍️": 165,
+    "Soup Kitchen: Reception 🙂": 154,
+    "Special Project: Data Entry": 171,
+    "Voucher Processing 🧾": 122
+}
+
+
+# Team leader committees ("**") only show up for members who are eligible
+TEAM_LEADER_COMMITTEES = {
+    committee_id for name, committee_id in SHIFT_MAPPING.items() if name.startswith('**')
+}
+
+def normalize_committee_name(name):
+    """Lowercase and drop the "**" (team leader) marker and surrounding space"""
+    return name.replace('**', '').strip().lower()
+
+_NORMALIZED_NAMES = {
+    normalize_committee_name(name): committee_id
+    for name, committee_id in SHIFT_MAPPING.items()
+    if committee_id != ALL_COMMITTEES
+}
+
+def committees_matching(shift_type):
+    """
+    IDs of the committees whose name contains shift_type (case-insensitive).
+
+    Shift descriptions on the grid are the committee names, so a preference
+    can only match shifts of these committees. Returns an empty set when the
+    text matches no known committee.
+    """
+    token = normalize_committee_name(shift_type)
+    if not token:
+        return set()
+    return {committee_id for name, committee_id in _NORMALIZED_NAMES.items() if token in name}
+
+def committee_id_for_description(description):
+    """The committee ID of a shift description, or None if it isn't a known committee"""
+    return _NORMALIZED_NAMES.get(normalize_committee_name(description))
@@ -0,0 +1,173 @@
+"""
+Resilient HTTP access to the coop site.
+
+CoopHttpSession is a requests session that every coop request goes through:
+    - a token bucket per host keeps us under COOP_RATE_LIMIT requests/second
+    - requests get connect/read timeouts unless the caller passes its own
+    - failures and 429/5xx responses are retried with jittered exponential backoff
+    - a circuit breaker per host fails fast while the site is down
+
+Retries, opened circuits and time spent waiting are counted in run_metrics.
+"""
+
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+from dotenv import load_dotenv
+from run_metrics import metrics
+
+load_dotenv()
+COOP_RATE_LIMIT = float(os.getenv('COOP_RATE_LIMIT', 5))  # Requests per second per host
+COOP_RATE_BURST = int(os.getenv('COOP_RATE_BURST', 10))
+COOP_CONNECT_TIMEOUT = float(os.getenv('COOP_CONNECT_TIMEOUT', 5))
+COOP_READ_TIMEOUT = float(os.getenv('COOP_READ_TIMEOUT', 20))
+COOP_MAX_RETRIES = int(os.getenv('COOP_MAX_RETRIES', 3))
+COOP_BACKOFF_BASE = float(os.getenv('COOP_BACKOFF_BASE', 0.5))  # Seconds
+COOP_BACKOFF_MAX = float(os.getenv('COOP_BACKOFF_MAX', 8))
+COOP_BREAKER_THRESHOLD = int(os.getenv('COOP_BREAKER_THRESHOLD', 5))  # Consecutive failures
+COOP_BREAKER_COOLDOWN = float(os.getenv('COOP_BREAKER_COOLDOWN', 60))  # Seconds
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without touching the network while a host's circuit is open"""
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second with bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available. Returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """
+    Closed: requests flow. After `threshold` consecutive failures it opens and
+    rejects requests for `cooldown` seconds, then lets a single trial request
+    through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def before_request(self, host):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at >= self.cooldown and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return
+        metrics.increment('http_circuit_rejections')
+        raise CircuitOpenError(f'Circuit open for {host}, not sending request')
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self, host):
+        with self.lock:
+            self.failures += 1
+            reopen = self.trial_in_flight
+            self.trial_in_flight = False
+            if reopen or (self.opened_at is None and self.failures >= self.threshold):
+                self.opened_at = time.monotonic()
+                metrics.increment('http_circuits_opened')
+                print(f'Circuit opened for {host} after {self.failures} consecutive failures')
+
+
+_buckets = {}
+_breakers = {}
+_registry_lock = threading.Lock()
+
+def bucket_for(host):
+    """The token bucket shared by every session talking to host"""
+    with _registry_lock:
+        if host not in _buckets:
+            _buckets[host] = TokenBucket(COOP_RATE_LIMIT, COOP_RATE_BURST)
+        return _buckets[host]
+
+def breaker_for(host):
+    """The circuit breaker shared by every session talking to host"""
+    with _registry_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(COOP_BREAKER_THRESHOLD, COOP_BREAKER_COOLDOWN)
+        return _breakers[host]
+
+def request_deadline(read_timeout=COOP_READ_TIMEOUT):
+    """Longest a request can take through every retry and backoff, rate limiting aside"""
+    attempts = COOP_MAX_RETRIES + 1
+    return attempts * (COOP_CONNECT_TIMEOUT + read_timeout) + COOP_MAX_RETRIES * COOP_BACKOFF_MAX
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+    return random.uniform(0, min(COOP_BACKOFF_MAX, COOP_BACKOFF_BASE * 2 ** attempt))
+
+
+class CoopHttpSession(requests.Session):
+    """requests.Session with rate limiting, timeouts, retries and a circuit breaker"""
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault('timeout', (COOP_CONNECT_TIMEOUT, COOP_READ_TIMEOUT))
+        host = urlparse(url).netloc
+        bucket = bucket_for(host)
+        breaker = breaker_for(host)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            breaker.before_request(host)
+            metrics.add_time('http_rate_limit_wait', bucket.acquire())
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except requests.exceptions.RequestException as e:
+                breaker.record_failure(host)
+                # A POST may have reached the server unless we never connected
+                retryable = idempotent or isinstance(e, requests.exceptions.ConnectTimeout)
+                if not retryable or attempt >= COOP_MAX_RETRIES:
+                    raise
+                print(f'{method} {url} failed ({e}), retrying')
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure(host)
+                if not idempotent or attempt >= COOP_MAX_RETRIES:
+                    return response
+                print(f'{method} {url} returned {response.status_code}, retrying')
+
+            delay = backoff_delay(attempt)
+            metrics.increment('http_retries')
+            metrics.add_time('http_backoff_wait', delay)
+            time.sleep(delay)
+            attempt += 1
@@ -0,0 +1,157 @@
+"""
+Authenticated sessions against the coop members site.
+
+Logging in costs a GET for the CSRF token and a POST, so sessions are kept
+in-process and their cookie jar is persisted with state_store. A session is
+only re-authenticated when the site redirects a request to the login page.
+"""
+
+import hashlib
+import os
+import threading
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+from coop_http import CoopHttpSession
+from state_store import load_state, save_state
+
+load_dotenv()
+COOP_BASEURL = os.getenv('COOP_BASEURL', 'https://members.foodcoop.com')
+LOGIN_PATH = '/services/login/'
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36"
+
+_sessions = {}
+_account_locks = {}
+_sessions_lock = threading.Lock()  # Guards both dicts, never held over the network
+
+
+def login(session, user, pw):
+    # First we gotta find the CSRF token + cookie
+    session.get(COOP_BASEURL + LOGIN_PATH)
+    csrf_token = session.cookies.get("csrftoken")  # Some sites store it in cookies
+    login_data, headers = build_login_request(user, pw, csrf_token)
+
+    # Get the session loaded
+    session.post(COOP_BASEURL + LOGIN_PATH, data=login_data, headers=headers)
+    return (login_data, headers)
+
+def build_login_request(user, pw, csrf_token):
+    """Build the login form data and headers for a CSRF token"""
+    login_data = {
+        "username": user,
+        "password": pw,
+        "submit": "Log In",
+        "csrfmiddlewaretoken": csrf_token
+    }
+    headers = {
+        "User-Agent": USER_AGENT,
+        "Referer": "https://members.foodcoop.com/services/login/",
+        "X-CSRFToken": csrf_token
+    }
+    return (login_data, headers)
+
+def account_digest(username):
+    """Short stable identifier for an account, safe to use in file names"""
+    return hashlib.sha256((username or '').encode('utf-8')).hexdigest()[:16]
+
+def is_login_redirect(response):
+    """True if the site bounced the request to the login page (expired session)"""
+    return bool(response.history) and urlparse(response.url).path.startswith(LOGIN_PATH)
+
+
+class CoopSession(CoopHttpSession):
+    """A rate-limited, retrying session that logs itself back in when the coop session expires"""
+
+    def __init__(self, username, password):
+        super().__init__()
+        self.username = username
+        self.password = password
+        self.login_data = None
+        self.login_headers = None
+        self._login_lock = threading.Lock()
+        self._login_generation = 0  # Bumped on every login
+
+    @property
+    def state_name(self):
+        return f'coop_session_{account_digest(self.username)}'
+
+    def login(self):
+        """Authenticate and persist the resulting cookie jar"""
+        self.login_data, self.login_headers = login(self, self.username, self.password)
+        self._login_generation += 1
+        self.save()
+
+    def relogin(self, stale_generation):
+        """Log in again unless another thread already did since stale_generation"""
+        with self._login_lock:
+            if self._login_generation == stale_generation:
+                print(f'Coop session for {self.username} expired, logging in again')
+                self.login()
+
+    def request(self, method, url, *args, **kwargs):
+        generation = self._login_generation
+        response = super().request(method, url, *args, **kwargs)
+        if urlparse(url).path.startswith(LOGIN_PATH) or not is_login_redirect(response):
+            return response
+
+        self.relogin(generation)
+        return super().request(method, url, *args, **kwargs)
+
+    def save(self):
+        cookies = [
+            {
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'expires': cookie.expires,
+                'secure': cookie.secure
+            }
+            for cookie in self.cookies
+        ]
+        save_state(self.state_name, {
+            'cookies': cookies,
+            'csrf_token': self.login_headers['X-CSRFToken'] if self.login_headers else None
+        })
+
+    def restore(self):
+        """Load a previously saved cookie jar. Returns False if there was none"""
+        state = load_state(self.state_name)
+        if not state or not state.get('cookies'):
+            return False
+
+        for cookie in state['cookies']:
+            self.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie['domain'],
+                path=cookie['path'],
+                expires=cookie['expires'],
+                secure=cookie['secure']
+            )
+        self.login_data, self.login_headers = build_login_request(
+            self.username, self.password, state.get('csrf_token')
+        )
+        return True
+
+
+def get_coop_session(username, password):
+    """
+    Get an authenticated session for a coop account.
+
+    Sessions are shared within the process and restored from disk across
+    processes, so a fresh login only happens the first time or after expiry.
+    """
+    with _sessions_lock:
+        account_lock = _account_locks.setdefault(username, threading.Lock())
+
+    # Accounts log in concurrently; only callers for the same account wait
+    with account_lock:
+        with _sessions_lock:
+            session = _sessions.get(username)
+        if session is None or session.password != password:
+            session = CoopSession(username, password)
+            if not session.restore():
+                session.login()
+            with _sessions_lock:
+                _sessions[username] = session
+        return session
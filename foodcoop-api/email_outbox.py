@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Transactional outbox for notification emails.
+
+A check run writes each user's matches to email_outbox in the same
+transaction that ledgers them, then a dispatcher drains the table on its own
+schedule: rows are claimed with SKIP LOCKED, soonest matched shift first,
+sent over the SMTP pool and retried with exponential backoff until EMAIL_MAX_ATTEMPTS,
+never within the drain that failed them. A dispatcher that
+dies mid-send leaves its rows claimed; they are picked up again once the
+claim is older than EMAIL_CLAIM_TIMEOUT. Every row carries an idempotency key
+derived from its matches, which keeps a re-run from queueing the same email
+twice and is sent as the Message-ID so a resend after a crash can be
+recognized downstream. Results are written a claimed batch at a time: one
+statement each for the outbox rows, the emailed preferences' flags and the
+users' Notification and AuditLog rows, all in one transaction. Each match carries the time its run scraped it, and
+the time from there to the server accepting the email is recorded as the
+match_notified_seconds distribution.
+
+With EMAIL_DIGEST_WINDOW_SECONDS set, a new email is held that long before it
+can be sent, and anything queued for the same address meanwhile is merged
+into it, so a burst of runs sends one digest per recipient.
+
+Run standalone (python email_outbox.py) to dispatch continuously.
+"""
+
+import hashlib
+import os
+import random
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import and_, nulls_last, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from email_service import deliver_shift_notification
+from models import db, AuditLog, EmailOutbox, Notification, ShiftPreference
+from notification_ledger import match_pair, record_notified
+from run_metrics import RunMetrics, metrics
+from shift_record import ShiftRecord
+from shift_snapshot import iso_date, shift_starts_at
+
+load_dotenv()
+EMAIL_SEND_WORKERS = int(os.getenv('EMAIL_SEND_WORKERS', 1))  # Emails in flight at once per dispatcher
+EMAIL_DISPATCH_BATCH = int(os.getenv('EMAIL_DISPATCH_BATCH', 50))  # Rows claimed per round
+EMAIL_DISPATCH_INTERVAL = float(os.getenv('EMAIL_DISPATCH_INTERVAL', 10))  # Seconds between drains
+EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', 6))
+EMAIL_RETRY_BASE = float(os.getenv('EMAIL_RETRY_BASE', 30))  # Seconds before the first retry
+EMAIL_RETRY_MAX = float(os.getenv('EMAIL_RETRY_MAX', 3600))
+EMAIL_CLAIM_TIMEOUT = float(os.getenv('EMAIL_CLAIM_TIMEOUT', 600))  # Seconds before a stuck claim is retried
+EMAIL_DIGEST_WINDOW = float(os.getenv('EMAIL_DIGEST_WINDOW_SECONDS', 0))  # Seconds to collect matches per recipient
+
+
+def idempotency_key(user_id, matches):
+    """Stable key for one user's notification about exactly these matches"""
+    pairs = sorted(f'{preference_id}:{shift_key}' for preference_id, shift_key in {match_pair(match) for match in matches})
+    return hashlib.sha256(f'{user_id}|{"|".join(pairs)}'.encode()).hexdigest()
+
+def message_id(key):
+    return f'<{key}@foodcoop-shift-checker>'
+
+def match_to_dict(match):
+    return {**match, "shift": match["shift"].to_dict()}
+
+def match_from_dict(data):
+    shift = data["shift"]
+    return {
+        **data,
+        "shift": ShiftRecord(shift["time"], shift["description"], shift["href"], data["day"], data["date"])
+    }
+
+def soonest_start(matches):
+    """Start of the earliest shift among matches"""
+    return min((shift_starts_at(iso_date(match["date"]), match["shift"]) for match in matches), default=None)
+
+def retry_delay(attempts):
+    """Seconds before retry number `attempts`: exponential with equal jitter, never under half the backoff"""
+    backoff = min(EMAIL_RETRY_MAX, EMAIL_RETRY_BASE * 2 ** (attempts - 1))
+    return backoff / 2 + random.uniform(0, backoff / 2)
+
+def enqueue_notification(user, to_email, matches):
+    """
+    Queue matches for one recipient and ledger them; the caller commits both together.
+
+    Within EMAIL_DIGEST_WINDOW of an earlier email to the same address that
+    hasn't been sent yet, the matches are added to that email instead.
+    """
+    now = datetime.utcnow()
+    held = None
+    if EMAIL_DIGEST_WINDOW > 0:
+        held = EmailOutbox.query.filter(
+            EmailOutbox.to_email == to_email,
+            EmailOutbox.status == 'pending',
+            EmailOutbox.attempts == 0,
+            EmailOutbox.next_attempt_at > now
+        ).order_by(EmailOutbox.id).with_for_update().first()
+
+    if held is not None:
+        queued = {match_pair(match_from_dict(match)) for match in held.matches}
+        held.matches = held.matches + [match_to_dict(match) for match in matches if match_pair(match) not in queued]
+        starts_at = soonest_start(matches)
+        if held.shift_starts_at is None or (starts_at and starts_at < held.shift_starts_at):
+            held.shift_starts_at = starts_at
+        if user["name"] not in held.user_name.split(' & '):
+            held.user_name = f'{held.user_name} & {user["name"]}'[:255]
+        metrics.increment('emails_coalesced')
+    else:
+        insert_notification(user, to_email, matches, next_attempt_at=now + timedelta(seconds=EMAIL_DIGEST_WINDOW))
+    record_notified(matches)
+
+def insert_notification(user, to_email, matches, next_attempt_at):
+    db.session.execute(
+        insert(EmailOutbox).on_conflict_do_nothing(index_elements=['idempotency_key']),
+        [{
+            'idempotency_key': idempotency_key(user["id"], matches),
+            'user_id': user["id"],
+            'to_email': to_email,
+            'user_name': user["name"],
+            'matches': [match_to_dict(match) for match in matches],
+            'status': 'pending',
+            'attempts': 0,
+            'next_attempt_at': next_attempt_at,
+            'shift_starts_at': soonest_start(matches),
+            'created_at': datetime.utcnow()
+        }]
+    )
+    metrics.increment('emails_queued')
+
+def claim_batch(limit=EMAIL_DISPATCH_BATCH, due_by=None):
+    """
+    Mark up to limit due rows as sending and return them as plain tuples, most urgent first.
+
+    Pending rows count as due when their next attempt is at or before due_by
+    (default now).
+    """
+    now = datetime.utcnow()
+    rows = EmailOutbox.query.filter(or_(
+        and_(EmailOutbox.status == 'pending', EmailOutbox.next_attempt_at <= (due_by or now)),
+        and_(EmailOutbox.status == 'sending', EmailOutbox.claimed_at < now - timedelta(seconds=EMAIL_CLAIM_TIMEOUT))
+    )).order_by(
+        nulls_last(EmailOutbox.shift_starts_at),
+        EmailOutbox.next_attempt_at
+    ).limit(limit).with_for_update(skip_locked=True).all()
+
+    claimed = []
+    for row in rows:
+        row.status = 'sending'
+        row.claimed_at = now
+        row.attempts += 1
+        claimed.append((row.id, row.idempotency_key, row.to_email, row.user_name, row.matches, row.user_id, row.attempts))
+    db.session.commit()
+    return claimed
+
+def notification_rows(user_id, matches, sent_at):
+    """One SHIFT_AVAILABLE Notification per user whose matches were in the email"""
+    by_user = {}
+    for match in matches:
+        by_user.setdefault(match.get("user_id") or user_id, []).append(match)
+    return [
+        {
+            'user_id': match_user_id,
+            'type': 'SHIFT_AVAILABLE',
+            'title': f'{len(user_matches)} matching shift(s) available',
+            'message': '\n'.join(
+                f'{match["day"]} {match["date"]} {match["shift"]["time"]}: {match["shift"]["description"]}'
+                for match in user_matches
+            ),
+            'is_read': False,
+            'sent_at': sent_at
+        }
+        for match_user_id, user_matches in by_user.items()
+    ]
+
+def record_results(outcomes, metrics=metrics):
+    """
+    Write a batch of send outcomes in one transaction.
+
+    Sent rows are marked sent, their preferences flagged already_emailed and
+    Notification and AuditLog rows added; failed rows are rescheduled (failed
+    once out of attempts). Costs the same handful of statements however many
+    emails the batch held.
+
+    Args:
+        outcomes: (claimed tuple, error or None, accepted_at) per email
+    """
+    now = datetime.utcnow()
+    sent_ids, preference_ids, notifications, audit_logs, retries = [], set(), [], [], []
+    for (outbox_id, key, to_email, _, matches, user_id, attempts), error, accepted_at in outcomes:
+        details = {'outbox_id': outbox_id, 'to_email': to_email, 'matches': len(matches), 'attempt': attempts}
+        if error is None:
+            sent_ids.append(outbox_id)
+            preference_ids.update(match["matched_preference"]["id"] for match in matches)
+            notifications.extend(notification_rows(user_id, matches, accepted_at))
+            audit_logs.append({'action': 'EMAIL_SENT', 'user_id': user_id, 'details': details, 'created_at': accepted_at})
+            continue
+        audit_logs.append({'action': 'EMAIL_FAILED', 'user_id': user_id, 'details': {**details, 'error': error}, 'created_at': now})
+        if attempts >= EMAIL_MAX_ATTEMPTS:
+            retries.append({'id': outbox_id, 'status': 'failed', 'last_error': error})
+            metrics.increment('emails_dead')
+            print(f"Giving up on email to {to_email} after {attempts} attempts: {error}")
+        else:
+            retries.append({
+                'id': outbox_id,
+                'status': 'pending',
+                'next_attempt_at': now + timedelta(seconds=retry_delay(attempts)),
+                'last_error': error
+            })
+            metrics.increment('email_retries_scheduled')
+
+    if sent_ids:
+        db.session.execute(update(EmailOutbox).where(EmailOutbox.id.in_(sent_ids)).values(
+            status='sent',
+            sent_at=now,
+            last_error=None
+        ))
+        # Leave updated_at alone: incremental matching reads it as "preference edited"
+        db.session.execute(update(ShiftPreference).where(ShiftPreference.id.in_(preference_ids)).values(
+            already_emailed=True,
+            updated_at=ShiftPreference.updated_at
+        ))
+        db.session.execute(insert(Notification), notifications)
+    if retries:
+        # Rows differ in status and retry time, so this is an executemany by primary key
+        for status in ('failed', 'pending'):
+            rows = [row for row in retries if row['status'] == status]
+            if rows:
+                db.session.execute(update(EmailOutbox), rows)
+    if audit_logs:
+        db.session.execute(insert(AuditLog), audit_logs)
+    db.session.commit()
+
+def dispatch_pending(workers=EMAIL_SEND_WORKERS, metrics=metrics):
+    """
+    Send every due outbox row. Needs an app context.
+
+    Sends, failures and found-to-notified latency are recorded in metrics:
+    the run's own when a check drains inline, a separate RunMetrics when the
+    dispatcher runs on its own thread or process.
+
+    Returns:
+        tuple: (sent, failed) counts for this drain
+    """
+    def send(item):
+        _, key, to_email, user_name, matches = item[:5]
+        try:
+            deliver_shift_notification(
+                to_email, user_name, [match_from_dict(match) for match in matches], message_id(key), metrics=metrics
+            )
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            print(f"Error sending email to {to_email}: {error}")
+            return item, error, None
+        accepted_at = datetime.utcnow()
+        print(f"Email sent successfully to {to_email}")
+        for match in matches:
+            if match.get("found_at"):
+                latency = (accepted_at - datetime.fromisoformat(match["found_at"])).total_seconds()
+                metrics.observe('match_notified_seconds', latency)
+        return item, None, accepted_at
+
+    # Retries scheduled during this drain wait for a later one, so an outage
+    # can't use up a row's attempts in one go
+    started = datetime.utcnow()
+    sent = failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while True:
+            batch = claim_batch(due_by=started)
+            if not batch:
+                break
+            outcomes = list(executor.map(send, batch))
+            record_results(outcomes, metrics)
+            for _, error, _ in outcomes:
+                sent += error is None
+                failed += error is not None
+    return sent, failed
+
+def run_dispatcher(app, stop_event, interval=EMAIL_DISPATCH_INTERVAL):
+    """
+    Drain the outbox every interval seconds until stop_event is set.
+
+    Each drain that sends anything logs its own metrics, kept apart from the
+    check runs' so a check resetting its metrics can't drop these samples.
+    """
+    while not stop_event.is_set():
+        drain_metrics = RunMetrics()
+        drain_metrics.record_decision('source', 'email_dispatcher')
+        try:
+            with app.app_context():
+                sent, failed = dispatch_pending(metrics=drain_metrics)
+            if sent or failed:
+                drain_metrics.log()
+        except Exception as e:
+            print(f"[{datetime.now()}] Email dispatch failed: {e}")
+        finally:
+            with app.app_context():
+                db.session.remove()
+        stop_event.wait(interval)
+
+def start_dispatcher(app, stop_event):
+    """run_dispatcher() on a daemon thread"""
+    thread = threading.Thread(target=run_dispatcher, args=(app, stop_event), name='email-dispatcher', daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    from app import app
+
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_event.set())
+
+    print(f"[{datetime.now()}] Email dispatcher started")
+    run_dispatcher(app, stop_event)
+    print(f"[{datetime.now()}] Email dispatcher stopped")
+
+if __name__ == "__main__":
+    main()
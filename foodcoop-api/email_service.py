@@ -1,95 +1,43 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import os
+import time
 from dotenv import load_dotenv
+from email_templates import render_notification
+from email_transport import email_transport
+from run_metrics import metrics
+from smtp_pool import SMTP_USERNAME
 
 load_dotenv()
+FROM_EMAIL = os.getenv('FROM_EMAIL', SMTP_USERNAME) or 'shift-checker@localhost'
 
-def send_shift_notification_email(to_email, user_name, matches):
+def send_shift_notification_email(to_email, user_name, matches, transport=None):
     """Send email notification about available shifts"""
     try:
-        base_url = os.getenv('COOP_BASE_URL', 'https://members.foodcoop.com')
-        # SMTP configuration
-        smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
-        smtp_port = int(os.getenv('SMTP_PORT', 587))
-        smtp_username = os.getenv('SMTP_USERNAME')
-        smtp_password = os.getenv('SMTP_PASSWORD')
-        from_email = os.getenv('FROM_EMAIL', smtp_username)
-
-        if not all([smtp_username, smtp_password]):
-            print("SMTP credentials not configured")
-            return False
-
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = f'Food Coop Shifts Available - {len(matches)} matches found!'
-        msg['From'] = from_email
-        msg['To'] = to_email
-
-        # Create HTML content
-        html_content = f"""
-        <html>
-        <body>
-            <h2>Hi {user_name}!</h2>
-            <p>Great news! We found {len(matches)} shift(s) that match your preferences:</p>
-            
-            {''.join([
-                f'''
-                <div style="border: 1px solid #ccc; margin: 10px 0; padding: 15px; border-radius: 5px;">
-                    <h3>{match["day"]} {match["date"]}</h3>
-                    <p><strong>Time:</strong> {match["shift"]["time"]}</p>
-                    <p><strong>Description:</strong> {match["shift"]["description"]}</p>
-                    <p><strong>Sign up:</strong> <a href="{match["shift"]["href"]}">Click here to sign up</a></p>
-                    <p><em>Matched preference: {match["matched_preference"]["shift_type"]} on {", ".join(match["matched_preference"]["days"])}</em></p>
-                </div>
-                ''' for match in matches
-            ])}
-            
-            <p>Don't wait too long - these shifts fill up quickly!</p>
-            <p>Best,<br>Food Coop Shift Notification System</p>
-        </body>
-        </html>
-        """
-
-        # Create plain text version
-        text_content = f"""
-Hi {user_name}!
-
-Great news! We found {len(matches)} shift(s) that match your preferences:
-
-{''.join([
-    f'''
-{match["day"]} {match["date"]}
-Time: {match["shift"]["time"]}
-Description: {match["shift"]["description"]}  
-Sign up: {match["shift"]["href"]}
-Matched preference: {match["matched_preference"]["shift_type"]} on {", ".join(match["matched_preference"]["days"])}
-
-''' for match in matches
-])}
-
-Don't wait too long - these shifts fill up quickly!
-
-Best,
-Food Coop Shift Notification System
-        """
-
-        # Attach parts
-        text_part = MIMEText(text_content, 'plain')
-        html_part = MIMEText(html_content, 'html')
-        msg.attach(text_part)
-        msg.attach(html_part)
-
-        # Send email
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_username, smtp_password)
-            server.send_message(msg)
-
+        deliver_shift_notification(to_email, user_name, matches, transport=transport)
         print(f"Email sent successfully to {to_email}")
         return True
 
     except Exception as e:
         print(f"Error sending email to {to_email}: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def deliver_shift_notification(to_email, user_name, matches, message_id=None, transport=None, metrics=metrics):
+    """
+    Send email notification about available shifts over the configured transport.
+
+    Raises on failure. message_id, when given, becomes the Message-ID header
+    so a resent copy of the same notification can be recognized. Send
+    counts and timings go to metrics (the run's RunMetrics by default).
+    """
+    transport = transport or email_transport()
+    if not transport.configured:
+        raise RuntimeError("SMTP credentials not configured")
+
+    message = render_notification(to_email, user_name, matches, FROM_EMAIL, message_id)
+    started = time.perf_counter()
+    try:
+        transport.send(FROM_EMAIL, to_email, message, metrics=metrics)
+    except Exception:
+        metrics.increment('emails_failed')
+        raise
+    metrics.observe('email_send_seconds', time.perf_counter() - started)
+    metrics.increment('emails_sent')
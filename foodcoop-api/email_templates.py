@@ -0,0 +1,150 @@
+"""
+Precompiled templates for the shift notification email.
+
+The text and HTML bodies are split into header, per-match and footer
+fragments once, at import. Rendering streams one fragment per match into a
+buffer, and the finished message is assembled straight into RFC 5322 bytes
+from a precompiled multipart skeleton instead of building MIMEMultipart
+objects and serializing them again for every recipient.
+"""
+
+import base64
+import html
+import io
+import secrets
+from email.header import Header
+from email.utils import formatdate
+
+SUBJECT = 'Food Coop Shifts Available - {count} matches found!'
+
+TEXT_HEADER = """
+Hi {user_name}!
+
+Great news! We found {count} shift(s) that match your preferences:
+
+"""
+TEXT_MATCH = """
+{day} {date}
+Time: {time}
+Description: {description}
+Sign up: {href}
+Matched preference: {shift_type} on {days}
+
+"""
+TEXT_FOOTER = """
+
+Don't wait too long - these shifts fill up quickly!
+
+Best,
+Food Coop Shift Notification System
+    """
+
+HTML_HEADER = """
+    <html>
+    <body>
+        <h2>Hi {user_name}!</h2>
+        <p>Great news! We found {count} shift(s) that match your preferences:</p>
+
+        """
+HTML_MATCH = """
+            <div style="border: 1px solid #ccc; margin: 10px 0; padding: 15px; border-radius: 5px;">
+                <h3>{day} {date}</h3>
+                <p><strong>Time:</strong> {time}</p>
+                <p><strong>Description:</strong> {description}</p>
+                <p><strong>Sign up:</strong> <a href="{href}">Click here to sign up</a></p>
+                <p><em>Matched preference: {shift_type} on {days}</em></p>
+            </div>
+            """
+HTML_FOOTER = """
+
+        <p>Don't wait too long - these shifts fill up quickly!</p>
+        <p>Best,<br>Food Coop Shift Notification System</p>
+    </body>
+    </html>
+    """
+
+MESSAGE_HEADERS = (
+    'Content-Type: multipart/alternative; boundary="{boundary}"\r\n'
+    'MIME-Version: 1.0\r\n'
+    'Subject: {subject}\r\n'
+    'From: {from_email}\r\n'
+    'To: {to_email}\r\n'
+    'Date: {date}\r\n'
+)
+MESSAGE_PART = (
+    '--{boundary}\r\n'
+    'Content-Type: text/{subtype}; charset="{charset}"\r\n'
+    'MIME-Version: 1.0\r\n'
+    'Content-Transfer-Encoding: {encoding}\r\n'
+    '\r\n'
+)
+
+
+class NotificationTemplate:
+    """One body's fragments, bound to their format methods"""
+
+    def __init__(self, header, match, footer, escape=None):
+        self.header = header.format_map
+        self.match = match.format_map
+        self.footer = footer.format_map
+        self.escape = escape or (lambda value: value)
+
+    def render(self, user_name, matches):
+        escape = self.escape
+        buffer = io.StringIO()
+        buffer.write(self.header({'user_name': escape(user_name), 'count': len(matches)}))
+        for match in matches:
+            shift = match["shift"]
+            preference = match["matched_preference"]
+            buffer.write(self.match({
+                'day': escape(match["day"]),
+                'date': escape(match["date"]),
+                'time': escape(shift.time),
+                'description': escape(shift.description),
+                'href': escape(shift.href),
+                'shift_type': escape(preference["shift_type"]),
+                'days': escape(", ".join(preference["days"]))
+            }))
+        buffer.write(self.footer({}))
+        return buffer.getvalue()
+
+
+TEXT_TEMPLATE = NotificationTemplate(TEXT_HEADER, TEXT_MATCH, TEXT_FOOTER)
+HTML_TEMPLATE = NotificationTemplate(HTML_HEADER, HTML_MATCH, HTML_FOOTER, escape=html.escape)
+
+
+def header_value(value):
+    """A header value with line breaks removed, RFC 2047 encoded if not ASCII"""
+    value = ' '.join(str(value).splitlines())
+    if value.isascii():
+        return value
+    return Header(value, 'utf-8').encode()
+
+def encode_part(buffer, boundary, subtype, body):
+    """Write one text/* part: 7bit when ASCII, otherwise base64 UTF-8"""
+    if body.isascii():
+        buffer.write(MESSAGE_PART.format(boundary=boundary, subtype=subtype, charset='us-ascii', encoding='7bit'))
+        buffer.write(body.replace('\r\n', '\n').replace('\n', '\r\n'))
+    else:
+        buffer.write(MESSAGE_PART.format(boundary=boundary, subtype=subtype, charset='utf-8', encoding='base64'))
+        buffer.write(base64.encodebytes(body.encode('utf-8')).decode('ascii').replace('\n', '\r\n'))
+    buffer.write('\r\n')
+
+def render_notification(to_email, user_name, matches, from_email, message_id=None):
+    """The whole notification email as bytes, ready for any transport"""
+    boundary = f'==============={secrets.token_hex(10)}=='
+    buffer = io.StringIO()
+    buffer.write(MESSAGE_HEADERS.format(
+        boundary=boundary,
+        subject=header_value(SUBJECT.format(count=len(matches))),
+        from_email=header_value(from_email),
+        to_email=header_value(to_email),
+        date=formatdate(localtime=True)
+    ))
+    if message_id:
+        buffer.write(f'Message-ID: {header_value(message_id)}\r\n')
+    buffer.write('\r\n')
+    encode_part(buffer, boundary, 'plain', TEXT_TEMPLATE.render(user_name, matches))
+    encode_part(buffer, boundary, 'html', HTML_TEMPLATE.render(user_name, matches))
+    buffer.write(f'--{boundary}--\r\n')
+    return buffer.getvalue().encode('ascii')
@@ -0,0 +1,90 @@
+"""
+Where notification emails go.
+
+EMAIL_TRANSPORT picks the transport:
+    smtp           - the pooled SMTP connections (default)
+    mbox:<path>    - append to a local mbox file
+    maildir:<path> - write into a local Maildir
+
+The file sinks need no mail server, which makes them handy for development
+and for benchmarking render and send throughput.
+"""
+
+import mailbox
+import os
+import threading
+from dotenv import load_dotenv
+from run_metrics import metrics
+from smtp_pool import smtp_pool
+
+load_dotenv()
+EMAIL_TRANSPORT = os.getenv('EMAIL_TRANSPORT', 'smtp')
+
+
+class SmtpTransport:
+    def __init__(self, pool=None):
+        self.pool = pool or smtp_pool()
+
+    @property
+    def configured(self):
+        return self.pool.configured
+
+    def send(self, from_email, to_email, message, metrics=metrics):
+        self.pool.send(from_email, to_email, message, metrics=metrics)
+
+    def close(self):
+        self.pool.close()
+
+
+class MboxTransport:
+    configured = True
+
+    def __init__(self, path):
+        self.mailbox = mailbox.mbox(path)
+        self._lock = threading.Lock()
+
+    def send(self, from_email, to_email, message, metrics=metrics):
+        with self._lock:
+            self.mailbox.add(message)
+            self.mailbox.flush()
+
+    def close(self):
+        with self._lock:
+            self.mailbox.close()
+
+
+class MaildirTransport:
+    configured = True
+
+    def __init__(self, path):
+        self.mailbox = mailbox.Maildir(path, create=True)
+
+    def send(self, from_email, to_email, message, metrics=metrics):
+        # Maildir delivery writes a uniquely named file, safe from several threads
+        self.mailbox.add(message)
+
+    def close(self):
+        pass
+
+
+def transport_from_spec(spec):
+    """A transport for "smtp", "mbox:<path>" or "maildir:<path>" """
+    kind, _, path = spec.partition(':')
+    if kind == 'smtp':
+        return SmtpTransport()
+    if kind == 'mbox' and path:
+        return MboxTransport(path)
+    if kind == 'maildir' and path:
+        return MaildirTransport(path)
+    raise ValueError(f'Unknown EMAIL_TRANSPORT {spec!r}')
+
+_transport = None
+_transport_lock = threading.Lock()
+
+def email_transport():
+    """The process-wide transport from EMAIL_TRANSPORT, created on first use"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = transport_from_spec(EMAIL_TRANSPORT)
+        return _transport
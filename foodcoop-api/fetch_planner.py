@@ -0,0 +1,135 @@
+"""
+Plan which shift calendar pages a matching run needs to download.
+
+Preferences only ever match shifts of the committees their shift type names,
+so instead of always downloading the all-committees page we can download just
+those committees' pages. Which is cheaper depends on how many committees are
+watched and how big their pages are, so the planner compares estimated costs
+learned from previous runs (downloaded bytes and parse time per page).
+"""
+
+import os
+from dotenv import load_dotenv
+from committees import ALL_COMMITTEES, committees_matching
+from models import db, ShiftPreference, User
+from state_store import load_state, save_state
+
+load_dotenv()
+# Fixed cost of one more request (connection, server time), in seconds
+COOP_REQUEST_OVERHEAD = float(os.getenv('COOP_REQUEST_OVERHEAD', 0.02))
+# Download speed from the coop site, in bytes per second
+COOP_BANDWIDTH = float(os.getenv('COOP_BANDWIDTH', 2000000))
+
+PLANNER_STATE = 'fetch_planner'
+# Starting estimates until real pages have been measured
+DEFAULT_PAGE_BYTES = {ALL_COMMITTEES: 60000}
+DEFAULT_COMMITTEE_PAGE_BYTES = 12000
+DEFAULT_PARSE_BYTES_PER_SECOND = 5000000
+EWMA_WEIGHT = 0.3  # Weight of the newest observation
+
+
+def page_cost(page_bytes, parse_seconds):
+    """Estimated seconds of work to download and parse one page"""
+    return COOP_REQUEST_OVERHEAD + page_bytes / COOP_BANDWIDTH + parse_seconds
+
+
+class PageCostStats:
+    """Moving averages of page size and parse time per committee"""
+
+    def __init__(self):
+        self.stats = load_state(PLANNER_STATE, {})
+
+    def estimate(self, committee_id):
+        """Return (bytes, parse_seconds) expected for one week page of committee_id"""
+        observed = self.stats.get(str(committee_id))
+        if observed:
+            return (observed['bytes'], observed['parse_seconds'])
+
+        page_bytes = DEFAULT_PAGE_BYTES.get(committee_id, DEFAULT_COMMITTEE_PAGE_BYTES)
+        return (page_bytes, page_bytes / DEFAULT_PARSE_BYTES_PER_SECOND)
+
+    def record(self, committee_id, page_bytes, parse_seconds):
+        observed = self.stats.get(str(committee_id))
+        if observed:
+            observed['bytes'] += EWMA_WEIGHT * (page_bytes - observed['bytes'])
+            observed['parse_seconds'] += EWMA_WEIGHT * (parse_seconds - observed['parse_seconds'])
+        else:
+            self.stats[str(committee_id)] = {'bytes': page_bytes, 'parse_seconds': parse_seconds}
+
+    def save(self):
+        save_state(PLANNER_STATE, self.stats)
+
+
+class FetchPlan:
+    """The committees to download pages for, and why"""
+
+    def __init__(self, committee_ids, reason, estimates=None):
+        self.committee_ids = sorted(committee_ids)
+        self.reason = reason
+        self.estimates = estimates or {}
+
+    @property
+    def all_committees(self):
+        return self.committee_ids == [ALL_COMMITTEES]
+
+    def as_dict(self):
+        return {
+            'committees': self.committee_ids,
+            'reason': self.reason,
+            'estimates': self.estimates
+        }
+
+
+def plan_fetch(shift_types, stats=None):
+    """
+    Choose between the all-committees page and per-committee pages.
+
+    Args:
+        shift_types: Distinct shift_type strings of the active preferences
+        stats: PageCostStats to estimate with (loaded from state by default)
+
+    Returns:
+        FetchPlan
+    """
+    committee_ids = set()
+    for shift_type in shift_types:
+        matching = committees_matching(shift_type)
+        if not matching:
+            # Unknown text could match any description, so we need every committee
+            return FetchPlan([ALL_COMMITTEES], f'"{shift_type}" matches no known committee')
+        committee_ids |= matching
+
+    if not committee_ids:
+        return FetchPlan([ALL_COMMITTEES], 'no active preferences')
+
+    stats = stats or PageCostStats()
+    all_cost = page_cost(*stats.estimate(ALL_COMMITTEES))
+    per_committee_cost = sum(page_cost(*stats.estimate(committee_id)) for committee_id in committee_ids)
+    estimates = {
+        'all_committees': round(all_cost, 4),
+        'per_committee': round(per_committee_cost, 4)
+    }
+
+    if per_committee_cost < all_cost:
+        return FetchPlan(committee_ids, f'{len(committee_ids)} committee page(s) are cheaper', estimates)
+    return FetchPlan([ALL_COMMITTEES], f'all-committees page is cheaper than {len(committee_ids)} committee page(s)', estimates)
+
+def plan_from_preferences():
+    """Plan the fetch for the distinct shift types of all active preferences"""
+    shift_types = [
+        shift_type for (shift_type,) in db.session.query(ShiftPreference.shift_type).join(User).filter(
+            User.is_active == True,
+            User.deleted_at.is_(None),
+            ShiftPreference.is_active == True
+        ).distinct()
+    ]
+    return plan_fetch(shift_types)
+
+def record_page_costs(observations):
+    """Update the cost estimates with (committee_id, bytes, parse_seconds) observations"""
+    if not observations:
+        return
+    stats = PageCostStats()
+    for committee_id, page_bytes, parse_seconds in observations:
+        stats.record(committee_id, page_bytes, parse_seconds)
+    stats.save()
@@ -0,0 +1,29 @@
+"""Add href index to available shifts
+
+Revision ID: 4b1e7c2a9f3d
+Revises: d67b3f8faabd
+Create Date: 2026-10-17 09:12:41.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b1e7c2a9f3d'
+down_revision = 'd67b3f8faabd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Each scrape looks shifts up by href and by is_available
+    with op.batch_alter_table('available_shifts', schema=None) as batch_op:
+        batch_op.create_index('ix_available_shifts_href', ['href'], unique=False)
+        batch_op.create_index('ix_available_shifts_is_available', ['is_available'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('available_shifts', schema=None) as batch_op:
+        batch_op.drop_index('ix_available_shifts_is_available')
+        batch_op.drop_index('ix_available_shifts_href')
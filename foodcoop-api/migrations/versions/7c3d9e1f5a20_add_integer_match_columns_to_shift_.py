@@ -0,0 +1,92 @@
+"""Add integer match columns to shift preferences
+
+Revision ID: 7c3d9e1f5a20
+Revises: 4b1e7c2a9f3d
+Create Date: 2026-10-17 11:03:27.518940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3d9e1f5a20'
+down_revision = '4b1e7c2a9f3d'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 1000  # Preferences per UPDATE
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+shift_preferences = sa.table(
+    'shift_preferences',
+    sa.column('id', sa.Integer),
+    sa.column('days', postgresql.ARRAY(sa.String)),
+    sa.column('time_range_start', sa.String),
+    sa.column('time_range_end', sa.String),
+    sa.column('days_mask', sa.SmallInteger),
+    sa.column('start_minute', sa.Integer),
+    sa.column('end_minute', sa.Integer),
+)
+
+
+def days_mask(days):
+    # Frozen copy of shift_times.days_mask() so the migration never changes
+    mask = 0
+    for day in days or []:
+        prefix = day.strip()[:3].lower()
+        if prefix in WEEKDAYS:
+            mask |= 1 << WEEKDAYS.index(prefix)
+    return mask
+
+
+def minutes(time_str):
+    try:
+        hour, minute = time_str.split(":")
+        return int(hour) * 60 + int(minute)
+    except Exception:
+        return 0
+
+
+def upgrade():
+    with op.batch_alter_table('shift_preferences', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('days_mask', sa.SmallInteger(), nullable=True))
+        batch_op.add_column(sa.Column('start_minute', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('end_minute', sa.Integer(), nullable=True))
+
+    # Backfill from the text columns, one UPDATE ... FROM (VALUES ...) per batch
+    connection = op.get_bind()
+    rows = connection.execute(sa.select(
+        shift_preferences.c.id,
+        shift_preferences.c.days,
+        shift_preferences.c.time_range_start,
+        shift_preferences.c.time_range_end
+    )).fetchall()
+    backfill = [
+        (row.id, days_mask(row.days), minutes(row.time_range_start), minutes(row.time_range_end))
+        for row in rows
+    ]
+    for start in range(0, len(backfill), BACKFILL_BATCH):
+        batch = sa.values(
+            sa.column('id', sa.Integer),
+            sa.column('days_mask', sa.SmallInteger),
+            sa.column('start_minute', sa.Integer),
+            sa.column('end_minute', sa.Integer),
+            name='backfill'
+        ).data(backfill[start:start + BACKFILL_BATCH])
+        connection.execute(
+            shift_preferences.update()
+            .where(shift_preferences.c.id == batch.c.id)
+            .values(
+                days_mask=batch.c.days_mask,
+                start_minute=batch.c.start_minute,
+                end_minute=batch.c.end_minute
+            )
+        )
+
+def downgrade():
+    with op.batch_alter_table('shift_preferences', schema=None) as batch_op:
+        batch_op.drop_column('end_minute')
+        batch_op.drop_column('start_minute')
+        batch_op.drop_column('days_mask')
@@ -0,0 +1,43 @@
+"""Add notification ledger
+
+Revision ID: a81f4c6d2e57
+Revises: 7c3d9e1f5a20
+Create Date: 2026-10-17 13:40:08.331572
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a81f4c6d2e57'
+down_revision = '7c3d9e1f5a20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_ledger',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('preference_id', sa.Integer(), nullable=False),
+    sa.Column('shift_key', sa.Text(), nullable=False),
+    sa.Column('notified_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['preference_id'], ['shift_preferences.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('preference_id', 'shift_key', name='uq_notification_ledger_preference_shift')
+    )
+
+
+    # Preferences flagged already_emailed were emailed about shifts we can't
+    # name from here. The next check ledgers whatever they match without
+    # sending anything, then clears the flag (notification_ledger.seed_ledger)
+    with op.batch_alter_table('shift_preferences', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('needs_ledger_seed', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.execute("UPDATE shift_preferences SET needs_ledger_seed = already_emailed IS TRUE")
+
+
+def downgrade():
+    with op.batch_alter_table('shift_preferences', schema=None) as batch_op:
+        batch_op.drop_column('needs_ledger_seed')
+
+    op.drop_table('notification_ledger')
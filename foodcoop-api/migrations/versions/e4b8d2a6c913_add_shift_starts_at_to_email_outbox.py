@@ -0,0 +1,26 @@
+"""Add shift_starts_at to email outbox
+
+Revision ID: e4b8d2a6c913
+Revises: c5e2b7d91f04
+Create Date: 2026-10-17 17:04:12.318560
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b8d2a6c913'
+down_revision = 'c5e2b7d91f04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('shift_starts_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.drop_column('shift_starts_at')
@@ -1,6 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from sqlalchemy.dialects.postgresql import ARRAY, JSON
+from shift_times import days_mask, time_to_minutes
 
 
 # Create db instance that will be initialized in app.py
@@ -50,7 +51,50 @@ class ShiftPreference(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    already_emailed = db.Column(db.Boolean, default=False)
+    already_emailed = db.Column(db.Boolean, default=False)  # Set once a match was emailed; NotificationLedger decides what to send
+    needs_ledger_seed = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())  # Emailed before the ledger existed
+    # Integer copies of days/time_range_* so matching can filter in SQL
+    days_mask = db.Column(db.SmallInteger)  # bit 0 = Monday ... bit 6 = Sunday
+    start_minute = db.Column(db.Integer)  # minutes since midnight
+    end_minute = db.Column(db.Integer)
+
+    def sync_match_columns(self):
+        """Recompute days_mask/start_minute/end_minute from days and the time range"""
+        self.days_mask = days_mask(self.days)
+        self.start_minute = time_to_minutes(self.time_range_start)
+        self.end_minute = time_to_minutes(self.time_range_end)
+
+class NotificationLedger(db.Model):
+    __tablename__ = 'notification_ledger'
+    __table_args__ = (
+        db.UniqueConstraint('preference_id', 'shift_key', name='uq_notification_ledger_preference_shift'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    preference_id = db.Column(db.Integer, db.ForeignKey('shift_preferences.id', ondelete='CASCADE'), nullable=False)
+    shift_key = db.Column(db.Text, nullable=False)  # shift_snapshot.identity_key(), usually the sign-up link
+    notified_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class EmailOutbox(db.Model):
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    idempotency_key = db.Column(db.String(64), unique=True, nullable=False)  # Also the email's Message-ID
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    to_email = db.Column(db.String(255), nullable=False)
+    user_name = db.Column(db.String(255), nullable=False)
+    matches = db.Column(JSON, nullable=False)  # The user's matches, shifts as plain dicts
+    status = db.Column(db.String(20), nullable=False, default='pending')  # "pending", "sending", "sent", "failed"
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    shift_starts_at = db.Column(db.DateTime)  # Start of the soonest matched shift; due rows are sent soonest first
+    claimed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
 
 class Notification(db.Model):
     __tablename__ = 'notifications'
@@ -85,7 +129,7 @@ class AvailableShift(db.Model):
     date = db.Column(db.String(10), nullable=False)  # e.g., "2024-01-15"
     time = db.Column(db.String(100), nullable=False)  # e.g., "5:00 PM - 10:00 PM"
     location = db.Column(db.String(255))
-    href = db.Column(db.Text)  # Link to the shift on the website
-    is_available = db.Column(db.Boolean, default=True)
+    href = db.Column(db.Text, index=True)  # Link to the shift on the website
+    is_available = db.Column(db.Boolean, default=True, index=True)
     found_at = db.Column(db.DateTime, default=datetime.utcnow)
     expires_at = db.Column(db.DateTime) 
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""
+Scrape with members' own coop credentials.
+
+The shared grid is fetched once with COOP_USERNAME, but team leader ("**")
+committees only list shifts to members who are eligible for them. When
+COOP_MULTI_ACCOUNT is on, every member who saved coop credentials and watches
+a team leader committee gets those committee pages fetched with their own
+session. Pages are fetched once per distinct account, identical grids are
+parsed once, and the run stops adding accounts once COOP_ACCOUNT_PAGE_BUDGET
+page requests have been planned. The next run starts from the first account
+that didn't fit, so every account gets its turn.
+"""
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from committees import TEAM_LEADER_COMMITTEES, committees_matching
+from coop_session import account_digest, get_coop_session
+from models import db, ShiftPreference, User
+from page_cache import PageCache
+from run_metrics import metrics
+from state_store import load_state, save_state
+
+load_dotenv()
+COOP_MULTI_ACCOUNT = os.getenv('COOP_MULTI_ACCOUNT', 'false').lower() == 'true'
+COOP_ACCOUNT_WORKERS = int(os.getenv('COOP_ACCOUNT_WORKERS', 8))  # Accounts scraped at once
+COOP_ACCOUNT_PAGE_BUDGET = int(os.getenv('COOP_ACCOUNT_PAGE_BUDGET', 200))  # Page requests per run
+ACCOUNT_CURSOR_STATE = 'member_account_cursor'
+
+
+class MemberAccount:
+    """One set of coop credentials and the team leader committees its users watch"""
+
+    def __init__(self, username, password):
+        self.username = username
+        self.password = password
+        self.user_ids = set()
+        self.committee_ids = set()
+
+
+def member_accounts():
+    """Distinct member accounts that watch at least one team leader committee"""
+    rows = db.session.query(
+        User.id, User.coop_username, User.coop_password, ShiftPreference.shift_type
+    ).join(ShiftPreference).filter(
+        User.is_active == True,
+        User.deleted_at.is_(None),
+        User.coop_username.isnot(None),
+        User.coop_username != '',
+        User.coop_password.isnot(None),
+        User.coop_password != '',
+        ShiftPreference.is_active == True
+    ).all()
+
+    accounts = {}
+    for user_id, username, password, shift_type in rows:
+        committee_ids = committees_matching(shift_type) & TEAM_LEADER_COMMITTEES
+        if not committee_ids:
+            continue
+        # Several users can share one coop login; it only needs scraping once
+        account = accounts.setdefault(username, MemberAccount(username, password))
+        account.user_ids.add(user_id)
+        account.committee_ids |= committee_ids
+
+    return [accounts[username] for username in sorted(accounts)]
+
+def budgeted_accounts(accounts, weeks):
+    """
+    The accounts that fit in COOP_ACCOUNT_PAGE_BUDGET, taken in username order
+    starting where the last over-budget run left off.
+
+    Returns:
+        tuple: (accounts to scrape, accounts skipped, pages planned)
+    """
+    cursor = load_state(ACCOUNT_CURSOR_STATE, {}).get('next')
+    start = next((i for i, account in enumerate(accounts) if cursor is not None and account.username >= cursor), 0)
+    chosen, skipped = [], []
+    pages_planned = 0
+    for account in accounts[start:] + accounts[:start]:
+        pages = weeks * len(account.committee_ids)
+        if pages_planned + pages > COOP_ACCOUNT_PAGE_BUDGET:
+            skipped.append(account)
+            continue
+        pages_planned += pages
+        chosen.append(account)
+
+    if skipped:
+        save_state(ACCOUNT_CURSOR_STATE, {'next': skipped[0].username})
+    return chosen, skipped, pages_planned
+
+def scrape_account(account, weeks):
+    from routes.shifts import get_open_shifts_next_2_weeks
+
+    session = get_coop_session(account.username, account.password)
+    return get_open_shifts_next_2_weeks(
+        session, session.login_data, session.login_headers,
+        weeks=weeks,
+        page_cache=PageCache(f'page_cache_{account_digest(account.username)}'),
+        committees=sorted(account.committee_ids)
+    )
+
+def scrape_member_accounts(shared_shifts, weeks):
+    """
+    Fetch the team leader shifts only visible to members' own accounts.
+
+    Args:
+        shared_shifts: Day dicts already scraped with the shared account
+        weeks: Number of weeks being watched
+
+    Returns:
+        dict: user_id -> day dicts holding only shifts missing from shared_shifts
+    """
+    accounts, skipped, pages_planned = budgeted_accounts(member_accounts(), weeks)
+    metrics.increment('accounts_over_budget', len(skipped))
+    metrics.record_decision('member_accounts', {
+        'accounts': len(accounts),
+        'pages': pages_planned,
+        'skipped': [account_digest(account.username) for account in skipped]
+    })
+    if not accounts:
+        return {}
+
+    shared_hrefs = {shift.href for day_data in shared_shifts for shift in day_data["shifts"]}
+    member_shifts = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(COOP_ACCOUNT_WORKERS, len(accounts)))) as executor:
+        futures = [(account, executor.submit(scrape_account, account, weeks)) for account in accounts]
+        for account, future in futures:
+            try:
+                days = future.result()
+            except Exception as e:
+                metrics.increment('account_scrape_failures')
+                print(f'Error scraping shifts for coop account {account.username}: {e}')
+                continue
+
+            extra_days = []
+            for day_data in days:
+                extra = [shift for shift in day_data["shifts"] if shift.href not in shared_hrefs]
+                if extra:
+                    extra_days.append({"day": day_data["day"], "date": day_data["date"], "shifts": extra})
+            for user_id in account.user_ids:
+                member_shifts[user_id] = extra_days
+
+    return member_shifts
+
+def member_shifts_digest(member_shifts):
+    """Hash of the member-only shifts, so a change to them counts as a grid change"""
+    hrefs = sorted(
+        f'{user_id}:{shift.href}'
+        for user_id, days in member_shifts.items()
+        for day_data in days
+        for shift in day_data["shifts"]
+    )
+    return hashlib.sha256('|'.join(hrefs).encode('utf-8')).hexdigest()
@@ -0,0 +1,106 @@
+"""
+Which shifts each preference has already been emailed about.
+
+notification_ledger holds one row per (preference, shift) pair that was
+emailed, with a unique index on the pair. Matches are anti-joined against it
+so a preference keeps notifying about new shifts while never repeating one.
+
+Preferences emailed before the ledger existed carry needs_ledger_seed. The
+first check that sees them ledgers their current matches without sending,
+since those are the shifts they were flagged for.
+"""
+
+from datetime import datetime
+from sqlalchemy import tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from models import db, NotificationLedger, ShiftPreference
+from shift_snapshot import identity_key, iso_date
+
+LOOKUP_CHUNK = 1000  # Pairs per lookup query
+
+
+def match_shift_key(match):
+    """The ledger's shift_key for one entry of a user's matches"""
+    shift = match["shift"]
+    return identity_key(shift.href, iso_date(match["date"]), shift.time, shift.description)
+
+def match_pair(match):
+    return (match["matched_preference"]["id"], match_shift_key(match))
+
+def notified_pairs(pairs):
+    """The (preference_id, shift_key) pairs among pairs that are in the ledger"""
+    pairs = list(pairs)
+    notified = set()
+    for start in range(0, len(pairs), LOOKUP_CHUNK):
+        chunk = pairs[start:start + LOOKUP_CHUNK]
+        # Row-value IN is answered from the unique (preference_id, shift_key) index
+        rows = db.session.query(NotificationLedger.preference_id, NotificationLedger.shift_key).filter(
+            tuple_(NotificationLedger.preference_id, NotificationLedger.shift_key).in_(chunk)
+        )
+        notified.update(tuple(row) for row in rows)
+    return notified
+
+def unnotified_matches(matches):
+    """
+    Drop matches already emailed for their preference.
+
+    Takes and returns the matches of check_all_users_shift_preferences(), a
+    [{"user": {...}, "matches": [...]}] list, leaving out users left with
+    no matches.
+    """
+    notified = notified_pairs({match_pair(match) for user_match in matches for match in user_match["matches"]})
+    if not notified:
+        return matches
+
+    remaining = []
+    for user_match in matches:
+        user_matches = [match for match in user_match["matches"] if match_pair(match) not in notified]
+        if user_matches:
+            remaining.append({**user_match, "matches": user_matches})
+    return remaining
+
+def preferences_awaiting_seed():
+    """IDs of preferences whose pre-ledger emails haven't been ledgered yet"""
+    return {preference_id for (preference_id,) in db.session.query(ShiftPreference.id).filter(
+        ShiftPreference.needs_ledger_seed == True
+    )}
+
+def seed_ledger(matches, preference_ids):
+    """
+    Ledger, without sending, the matches of preferences awaiting a seed.
+
+    Needs a full match (not an incremental one) so every shift those
+    preferences were emailed about is seen. Commits, and returns the
+    remaining matches in the same shape as unnotified_matches().
+    """
+    remaining = []
+    seeded = 0
+    for user_match in matches:
+        seed = [match for match in user_match["matches"] if match["matched_preference"]["id"] in preference_ids]
+        record_notified(seed)
+        seeded += len(seed)
+        user_matches = [match for match in user_match["matches"] if match["matched_preference"]["id"] not in preference_ids]
+        if user_matches:
+            remaining.append({**user_match, "matches": user_matches})
+    # Leave updated_at alone: incremental matching reads it as "preference edited"
+    db.session.execute(update(ShiftPreference).where(ShiftPreference.id.in_(preference_ids)).values(
+        needs_ledger_seed=False,
+        updated_at=ShiftPreference.updated_at
+    ))
+    db.session.commit()
+    print(f'Seeded the notification ledger with {seeded} match(es) of {len(preference_ids)} previously emailed preference(s)')
+    return remaining
+
+def record_notified(user_matches):
+    """Add one user's emailed matches to the ledger; the caller commits"""
+    rows = [
+        {'preference_id': preference_id, 'shift_key': shift_key, 'notified_at': datetime.utcnow()}
+        for preference_id, shift_key in {match_pair(match) for match in user_matches}
+    ]
+    if rows:
+        db.session.execute(
+            insert(NotificationLedger).on_conflict_do_nothing(
+                index_elements=['preference_id', 'shift_key']
+            ),
+            rows
+        )
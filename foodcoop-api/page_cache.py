@@ -0,0 +1,121 @@
+"""
+Per-URL cache of shift grid pages.
+
+For every URL we remember the last ETag / Last-Modified validators, a hash of
+the grid markup and the days parsed from it. Unchanged pages (a 304, or a body
+with the same hash) reuse the cached days and are never parsed again.
+
+Each consumer keeps its own cache file. save() only drops pages that haven't
+been fetched for PAGE_CACHE_MAX_AGE (the URLs carry today's date, so old ones
+are never asked for again), so a consumer switching between fetch plans
+keeps the validators of both.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from shift_record import deserialize_days, serialize_days
+from state_store import load_state, save_state
+
+PAGE_CACHE_STATE = 'page_cache'  # The shift checker's
+API_PAGE_CACHE_STATE = 'page_cache_api'  # /check-shifts' own scrapes
+GRID_MARKER = 'grid-container'
+# Per-request tokens that would otherwise make every body hash differ
+VOLATILE_PATTERN = re.compile(r'name="csrfmiddlewaretoken" value="[^"]*"')
+PARSED_MEMO_SIZE = 256
+PAGE_CACHE_MAX_AGE = 24 * 3600  # Seconds a page is kept after it was last fetched
+
+_parsed_pages = OrderedDict()
+_parsed_pages_lock = threading.Lock()
+
+def content_hash(html_content):
+    """Hash the part of a page that describes the shift grid"""
+    start = html_content.find(GRID_MARKER)
+    grid_markup = html_content[start:] if start >= 0 else html_content
+    grid_markup = VOLATILE_PATTERN.sub('', grid_markup)
+    return hashlib.sha256(grid_markup.encode('utf-8')).hexdigest()
+
+
+def parse_once(html_content, parse):
+    """
+    Parse a page, reusing the result for identical grids seen recently.
+
+    Several accounts often get byte-for-byte the same grid; only the first
+    copy is parsed. The returned days are shared, so callers mustn't mutate them.
+    """
+    key = content_hash(html_content)
+    with _parsed_pages_lock:
+        if key in _parsed_pages:
+            _parsed_pages.move_to_end(key)
+            return _parsed_pages[key]
+
+    days = parse(html_content)
+    with _parsed_pages_lock:
+        _parsed_pages[key] = days
+        while len(_parsed_pages) > PARSED_MEMO_SIZE:
+            _parsed_pages.popitem(last=False)
+    return days
+
+
+class PageCache:
+    """Validators, body hashes and parsed days for previously fetched pages"""
+
+    def __init__(self, name=PAGE_CACHE_STATE):
+        self.name = name
+        self.records = load_state(name, {})
+
+    def conditional_headers(self, url):
+        """Headers that let the server answer 304 Not Modified for url"""
+        record = self.records.get(url)
+        if not record:
+            return {}
+
+        headers = {}
+        if record.get('etag'):
+            headers['If-None-Match'] = record['etag']
+        if record.get('last_modified'):
+            headers['If-Modified-Since'] = record['last_modified']
+        return headers
+
+    def cached_days(self, url, response):
+        """
+        Return the previously parsed days if response is unchanged, else None.
+
+        Unchanged means the server answered 304, or the grid markup hashes to
+        the same value as last time.
+        """
+        record = self.records.get(url)
+        if not record:
+            return None
+        if response.status_code == 304:
+            record['fetched_at'] = time.time()
+            return deserialize_days(record['days'])
+        if content_hash(response.text) == record['hash']:
+            self._store_validators(record, response)
+            return deserialize_days(record['days'])
+        return None
+
+    def store(self, url, response, days):
+        """Remember a freshly parsed page"""
+        record = {'hash': content_hash(response.text), 'days': serialize_days(days)}
+        self._store_validators(record, response)
+        self.records[url] = record
+
+    def fingerprint(self, urls):
+        """A single hash identifying the current content of all of urls"""
+        hashes = [self.records[url]['hash'] if url in self.records else '' for url in urls]
+        return hashlib.sha256('|'.join(hashes).encode('utf-8')).hexdigest()
+
+    def save(self):
+        """Persist the cache, dropping pages not fetched for PAGE_CACHE_MAX_AGE (e.g. past dates)"""
+        cutoff = time.time() - PAGE_CACHE_MAX_AGE
+        self.records = {url: record for url, record in self.records.items() if record.get('fetched_at', 0) >= cutoff}
+        save_state(self.name, self.records)
+
+    @staticmethod
+    def _store_validators(record, response):
+        record['fetched_at'] = time.time()
+        record['etag'] = response.headers.get('ETag')
+        record['last_modified'] = response.headers.get('Last-Modified')
@@ -0,0 +1,288 @@
+"""
+Compiled index of active shift preferences for one matching run.
+
+Instead of testing every preference against every shift, preferences are
+bucketed by weekday and then by their lowercased shift type. One automaton
+pass over a scraped shift's description finds the shift types occurring in
+it, and the shift is only tested against those buckets for its weekday.
+Preference time ranges are parsed once up front.
+
+With COOP_MATCH_BACKEND=numpy (and NumPy installed) the weekday and time
+overlap of every preference/shift pair is instead computed in one broadcast
+over integer arrays, and the automaton's shift type hits are broadcast the
+same way.
+"""
+
+import os
+from dotenv import load_dotenv
+from shift_times import WEEKDAYS, days_mask, mask_weekdays, time_to_minutes, weekday_index
+from type_matcher import type_matcher
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional, the bucket matcher always works
+    numpy = None
+
+load_dotenv()
+COOP_MATCH_BACKEND = os.getenv('COOP_MATCH_BACKEND', 'index')  # "index" or "numpy"
+COOP_MATCH_CHUNK = int(os.getenv('COOP_MATCH_CHUNK', 4096))  # Preferences per broadcast
+
+
+def unseen_days(days, seen, user_id=None):
+    """Copies of day dicts keeping only shifts whose key() isn't in seen"""
+    return [
+        {**day_data, "shifts": [shift for shift in day_data["shifts"] if shift.key(user_id) not in seen]}
+        for day_data in days
+    ]
+
+
+class CompiledPreference:
+    """A preference with its match inputs pre-parsed"""
+
+    __slots__ = ('id', 'user', 'token', 'start_minute', 'end_minute', 'days_mask', 'matched_preference')
+
+    def __init__(self, preference, user):
+        self.id = preference.id
+        self.user = user
+        self.token = preference.shift_type.lower()
+        # Prefer the integer columns; rows from before they existed hold NULL
+        self.start_minute = getattr(preference, 'start_minute', None)
+        if self.start_minute is None:
+            self.start_minute = time_to_minutes(preference.time_range_start)
+        self.end_minute = getattr(preference, 'end_minute', None)
+        if self.end_minute is None:
+            self.end_minute = time_to_minutes(preference.time_range_end)
+        self.days_mask = getattr(preference, 'days_mask', None)
+        if self.days_mask is None:
+            self.days_mask = days_mask(preference.days)
+        self.matched_preference = {
+            "id": preference.id,
+            "shift_type": preference.shift_type,
+            "days": preference.days,
+            "time_range_start": preference.time_range_start,
+            "time_range_end": preference.time_range_end,
+            "notification_email": preference.notification_email
+        }
+
+    def overlaps(self, start_minute, end_minute):
+        return start_minute < self.end_minute and end_minute > self.start_minute
+
+
+class PreferenceIndex:
+    """Preferences bucketed by weekday, then by shift type token"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or COOP_MATCH_BACKEND
+        if self.backend == 'numpy' and numpy is None:
+            self.backend = 'index'
+        self._arrays = None  # NumPy columns of self.preferences, built on first use
+        self._tokens = []  # Distinct shift type tokens, rows of the token/shift matrix
+        self._token_rows = None  # Each preference's row in _tokens
+        self._type_matcher = None  # Automaton over all preference tokens, built on first use
+        self.users = {}  # user id -> user dict, in insertion order
+        self.preferences = []  # CompiledPreference, in insertion order
+        self.buckets = [{} for _ in WEEKDAYS]  # weekday -> token -> [CompiledPreference]
+
+    @classmethod
+    def from_users(cls, users, backend=None):
+        """Index the active preferences of User models"""
+        index = cls(backend)
+        for user in users:
+            for preference in user.shift_preferences:
+                if preference.is_active:
+                    index.add(preference, user)
+        return index
+
+    @classmethod
+    def from_rows(cls, rows, backend=None):
+        """
+        Index query rows, one per active preference.
+
+        Rows carry the preference's columns plus user_id, user_name,
+        user_email and user_notification_email (see active_preference_rows()).
+        """
+        index = cls(backend)
+        for row in rows:
+            user = index.users.get(row.user_id)
+            if user is None:
+                user = index.users[row.user_id] = {
+                    "id": row.user_id,
+                    "name": row.user_name,
+                    "email": row.user_email,
+                    "notification_email": row.user_notification_email
+                }
+            index._add_compiled(CompiledPreference(row, user))
+        return index
+
+    def add(self, preference, user):
+        if user.id not in self.users:
+            self.users[user.id] = {
+                "id": user.id,
+                "name": user.name,
+                "email": user.email,
+                "notification_email": user.notification_email
+            }
+        self._add_compiled(CompiledPreference(preference, self.users[user.id]))
+
+    def _add_compiled(self, compiled):
+        self.preferences.append(compiled)
+        self._arrays = None
+        self._type_matcher = None
+        for weekday in mask_weekdays(compiled.days_mask):
+            self.buckets[weekday].setdefault(compiled.token, []).append(compiled)
+
+    def subset(self, keep):
+        """A new index of the preferences for which keep(CompiledPreference) is true"""
+        index = PreferenceIndex(self.backend)
+        for compiled in self.preferences:
+            if keep(compiled):
+                index.users.setdefault(compiled.user["id"], compiled.user)
+                index._add_compiled(compiled)
+        return index
+
+    def shift_types_in(self, description):
+        """Preference tokens occurring in a lowercased description"""
+        if self._type_matcher is None:
+            self._type_matcher = type_matcher(preference.token for preference in self.preferences)
+        return self._type_matcher.find(description)
+
+    def candidates(self, weekday, description):
+        """Preferences for weekday whose shift type occurs in the lowercased description"""
+        bucket = self.buckets[weekday]
+        for token in self.shift_types_in(description):
+            yield from bucket.get(token, ())
+
+    def match(self, open_shifts, member_shifts=None, seen=None, changed_ids=None):
+        """
+        Match scraped shifts against the index.
+
+        Args:
+            open_shifts: Day dicts (with ShiftRecords) every user can sign up for
+            member_shifts: Optional user id -> day dicts only that user can see
+            seen: Optional ShiftRecord.key()s already matched by an earlier
+                run. Seen shifts are then only matched against changed_ids,
+                while new shifts are matched against every preference.
+            changed_ids: Preference ids changed since that earlier run
+
+        Returns:
+            list: [{"user": {...}, "matches": [...]}] in the shape
+                check_all_users_shift_preferences() has always returned for its matches
+        """
+        found = {}  # preference id -> matches
+        if seen is None:
+            self._match_all(open_shifts, member_shifts, found)
+        else:
+            # Changed preferences against every shift, the rest only against
+            # new shifts, so each preference's matches stay in page order
+            changed_ids = changed_ids or set()
+            if changed_ids:
+                changed = self.subset(lambda compiled: compiled.id in changed_ids)
+                changed._match_all(open_shifts, member_shifts, found)
+            new_open = unseen_days(open_shifts, seen)
+            new_member = {
+                user_id: unseen_days(days, seen, user_id)
+                for user_id, days in (member_shifts or {}).items()
+            }
+            if any(day_data["shifts"] for days in [new_open, *new_member.values()] for day_data in days):
+                unchanged = self.subset(lambda compiled: compiled.id not in changed_ids)
+                unchanged._match_all(new_open, new_member, found)
+
+        matches = []
+        user_matches = {}
+        for preference in self.preferences:
+            if preference.id not in found:
+                continue
+            user = preference.user
+            if user["id"] not in user_matches:
+                user_matches[user["id"]] = []
+                matches.append({"user": user, "matches": user_matches[user["id"]]})
+            user_matches[user["id"]].extend(found[preference.id])
+        return matches
+
+    def _match_all(self, open_shifts, member_shifts, found):
+        match_days = self._match_days_numpy if self.backend == 'numpy' else self._match_days
+        match_days(open_shifts, found)
+        for user_id, days in (member_shifts or {}).items():
+            match_days(days, found, user_id)
+
+    def _match_days(self, days, found, user_id=None):
+        for day_data in days:
+            weekday = weekday_index(day_data["day"])
+            if weekday is None or not self.buckets[weekday]:
+                continue
+            for shift in day_data["shifts"]:
+                if shift.start_minute is None:
+                    continue
+                for preference in self.candidates(weekday, shift.description_lower):
+                    if user_id is not None and preference.user["id"] != user_id:
+                        continue
+                    if not preference.overlaps(shift.start_minute, shift.end_minute):
+                        continue
+                    found.setdefault(preference.id, []).append({
+                        "day": day_data["day"],
+                        "date": day_data["date"],
+                        "shift": shift,
+                        "matched_preference": preference.matched_preference
+                    })
+
+    def _preference_arrays(self):
+        if self._arrays is None:
+            self._arrays = (
+                numpy.array([preference.start_minute for preference in self.preferences], dtype=numpy.int32),
+                numpy.array([preference.end_minute for preference in self.preferences], dtype=numpy.int32),
+                numpy.array([preference.days_mask for preference in self.preferences], dtype=numpy.int16),
+                numpy.array([preference.user["id"] for preference in self.preferences], dtype=numpy.int64)
+            )
+            tokens = {}  # shift type token -> row in the token/shift matrix
+            self._token_rows = numpy.array(
+                [tokens.setdefault(preference.token, len(tokens)) for preference in self.preferences],
+                dtype=numpy.int32
+            )
+            self._tokens = list(tokens)
+        return self._arrays
+
+    def _match_days_numpy(self, days, found, user_id=None):
+        """_match_days() with the weekday/time test broadcast over all pairs"""
+        shifts = []  # (day_data, shift) in page order
+        for day_data in days:
+            weekday = weekday_index(day_data["day"])
+            if weekday is None:
+                continue
+            for shift in day_data["shifts"]:
+                if shift.start_minute is not None:
+                    shifts.append((day_data, shift, 1 << weekday))
+        if not shifts or not self.preferences:
+            return
+
+        shift_start = numpy.array([shift.start_minute for _, shift, _ in shifts], dtype=numpy.int32)
+        shift_end = numpy.array([shift.end_minute for _, shift, _ in shifts], dtype=numpy.int32)
+        shift_bit = numpy.array([bit for _, _, bit in shifts], dtype=numpy.int16)
+        preference_start, preference_end, preference_mask, preference_user = self._preference_arrays()
+        shift_types = [self.shift_types_in(shift.description_lower) for _, shift, _ in shifts]
+        token_in_shift = numpy.array(
+            [[token in types for types in shift_types] for token in self._tokens],
+            dtype=bool
+        )
+
+        # Chunk the preferences so the pair matrix stays a few MB
+        for offset in range(0, len(self.preferences), COOP_MATCH_CHUNK):
+            rows = slice(offset, offset + COOP_MATCH_CHUNK)
+            candidates = (
+                ((preference_mask[rows, None] & shift_bit[None, :]) != 0)
+                & (shift_start[None, :] < preference_end[rows, None])
+                & (shift_end[None, :] > preference_start[rows, None])
+            )
+            if user_id is not None:
+                candidates &= (preference_user[rows] == user_id)[:, None]
+            candidates &= token_in_shift[self._token_rows[rows]]
+
+            # Row-major order keeps each preference's matches in page order
+            for row, column in zip(*numpy.nonzero(candidates)):
+                preference = self.preferences[offset + row]
+                day_data, shift, _ = shifts[column]
+                found.setdefault(preference.id, []).append({
+                    "day": day_data["day"],
+                    "date": day_data["date"],
+                    "shift": shift,
+                    "matched_preference": preference.matched_preference
+                })
@@ -0,0 +1,162 @@
+"""
+Latest open shifts grid, published by the checker for the API to serve.
+
+Every full-grid scrape is written to a state file together with a version
+(bumped whenever the shifts change) and the time it was published, so
+/check-shifts can answer from disk instead of logging in and scraping during
+the request. Each process keeps the parsed snapshot and only re-reads the file
+when it changes. A snapshot older than COOP_SHIFTS_MAX_AGE is still served
+while one process refreshes it in the background; an flock on a lock file
+makes sure only one refresh runs at a time across all API workers.
+
+The checker usually fetches only the committees its users watch, so it asks
+publish_due() and fetches the full grid instead about once every
+COOP_PUBLISH_EVERY_CHECKS checks, timed from the gap between its own runs so
+the per-committee plan stays the norm whatever the check cadence.
+"""
+
+import fcntl
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from dotenv import load_dotenv
+from shift_record import deserialize_days, serialize_days
+from state_store import STATE_DIR, load_state, save_state, state_path
+
+load_dotenv()
+COOP_SHIFTS_MAX_AGE = float(os.getenv('COOP_SHIFTS_MAX_AGE', 300))  # Seconds before /check-shifts refreshes the grid
+COOP_PUBLISH_EVERY_CHECKS = int(os.getenv('COOP_PUBLISH_EVERY_CHECKS', 6))  # Checker runs per full-grid fetch for the snapshot
+PUBLISHED_STATE = 'published_shifts'
+CHECK_CADENCE_STATE = 'check_cadence'
+
+_cache_lock = threading.Lock()
+_cached = (None, None)  # (file mtime_ns, snapshot)
+_refreshing = threading.Lock()  # Held by this process's background refresh
+
+
+class ShiftSnapshot:
+    """A published grid: days as the scrape returned them, its version and age"""
+
+    def __init__(self, days, version, published_at):
+        self.days = days
+        self.version = version
+        self.published_at = published_at
+
+    @property
+    def age(self):
+        return (datetime.utcnow() - self.published_at).total_seconds()
+
+
+@contextmanager
+def publish_lock(blocking=True):
+    """Hold the cross-process publish lock; yields False if not blocking and it's taken"""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    with open(os.path.join(STATE_DIR, f'.{PUBLISHED_STATE}.lock'), 'w') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def publish_shifts(open_shifts):
+    """Publish a full-grid scrape; the version only moves when the shifts changed"""
+    with publish_lock():
+        return _publish(open_shifts)
+
+def _publish(open_shifts):
+    shifts = serialize_days(open_shifts)
+    previous = load_state(PUBLISHED_STATE, {})
+    version = previous.get('version', 0)
+    if previous.get('shifts') != shifts:
+        version += 1
+    save_state(PUBLISHED_STATE, {
+        'version': version,
+        'published_at': datetime.utcnow().isoformat(),
+        'shifts': shifts
+    })
+    return version
+
+def note_check():
+    """Record a checker run; returns the seconds since the previous one, or None"""
+    now = datetime.utcnow()
+    previous = load_state(CHECK_CADENCE_STATE, {}).get('checked_at')
+    save_state(CHECK_CADENCE_STATE, {'checked_at': now.isoformat()})
+    if not previous:
+        return None
+    return (now - datetime.fromisoformat(previous)).total_seconds()
+
+def publish_due(check_interval):
+    """True when the checker should fetch the full grid to keep the snapshot fresh"""
+    snapshot = load_published()
+    if snapshot is None:
+        return True
+    if check_interval is None:
+        return snapshot.age >= COOP_SHIFTS_MAX_AGE
+    return snapshot.age >= COOP_PUBLISH_EVERY_CHECKS * check_interval
+
+def load_published():
+    """The published ShiftSnapshot, or None before the first publish"""
+    global _cached
+    try:
+        mtime = os.stat(state_path(PUBLISHED_STATE)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _cache_lock:
+        if _cached[0] == mtime:
+            return _cached[1]
+    data = load_state(PUBLISHED_STATE)
+    if not data:
+        return None
+    snapshot = ShiftSnapshot(
+        deserialize_days(data['shifts']),
+        data['version'],
+        datetime.fromisoformat(data['published_at'])
+    )
+    with _cache_lock:
+        _cached = (mtime, snapshot)
+    return snapshot
+
+def _refresh(scrape, max_age, blocking):
+    """Scrape and publish unless another process is already at it"""
+    with publish_lock(blocking) as locked:
+        if not locked:
+            return
+        # Whoever held the lock before us may have just published
+        snapshot = load_published()
+        if snapshot is None or snapshot.age >= max_age:
+            _publish(scrape())
+
+def _refresh_in_background(scrape, max_age):
+    if not _refreshing.acquire(blocking=False):
+        return
+
+    def run():
+        try:
+            _refresh(scrape, max_age, blocking=False)
+        except Exception as e:
+            print(f'Error refreshing published shifts: {e}')
+        finally:
+            _refreshing.release()
+
+    threading.Thread(target=run, name='shift-snapshot-refresh', daemon=True).start()
+
+def current_shifts(scrape, max_age=COOP_SHIFTS_MAX_AGE):
+    """
+    The published ShiftSnapshot, refreshed with scrape() when needed.
+
+    A stale snapshot is returned right away and refreshed in the background.
+    Only when nothing has been published yet does the caller wait for a scrape
+    (its own, or the one another process is already running).
+    """
+    snapshot = load_published()
+    if snapshot is None:
+        _refresh(scrape, max_age, blocking=True)
+        return load_published()
+    if snapshot.age >= max_age:
+        _refresh_in_background(scrape, max_age)
+    return snapshot
@@ -3,16 +3,40 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db, ShiftPreference, User
 from datetime import datetime
 from flask import jsonify
-import requests
 import os
 from datetime import datetime
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
-import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from sqlalchemy import and_, false, func, or_
+from committees import ALL_COMMITTEES
+from coop_http import COOP_CONNECT_TIMEOUT, request_deadline
+from coop_session import get_coop_session, is_login_redirect
+from fetch_planner import FetchPlan, plan_from_preferences, record_page_costs
+from multi_account import COOP_MULTI_ACCOUNT, member_shifts_digest, scrape_member_accounts
+from notification_ledger import preferences_awaiting_seed, seed_ledger, unnotified_matches
+from page_cache import API_PAGE_CACHE_STATE, PageCache, parse_once
+from published_shifts import current_shifts, note_check, publish_due, publish_shifts
+from preference_index import PreferenceIndex
+from run_metrics import metrics
+from shift_parser import parse_shifts_page
+from shift_record import serialize_days
+from shift_snapshot import persist_snapshot
+from state_store import load_state, save_state
 
 # Load environment variables
 load_dotenv()
 COOP_BASEURL = os.getenv('COOP_BASEURL', 'https://members.foodcoop.com')
+COOP_WEEKS_AHEAD = int(os.getenv('COOP_WEEKS_AHEAD', 2))  # Week pages to watch
+COOP_FETCH_WORKERS = int(os.getenv('COOP_FETCH_WORKERS', 4))  # Concurrent page fetches
+COOP_PAGE_TIMEOUT = float(os.getenv('COOP_PAGE_TIMEOUT', 20))  # Read timeout per page request attempt
+COOP_INCREMENTAL_MATCH = os.getenv('COOP_INCREMENTAL_MATCH', 'false').lower() == 'true'  # Match only what changed on cron runs
+PREFERENCE_BATCH_SIZE = 2000  # Preference rows fetched per round trip while matching
+LAST_CHECK_STATE = 'last_check'
+MATCH_STATE = 'incremental_match'
+# Returned by check_all_users_shift_preferences when there is nothing new to match
+NO_CHANGE = 'NO_CHANGE'
 
 shifts_bp = Blueprint('shifts', __name__)
 
@@ -91,6 +115,7 @@ def create_shift_preference():
             notification_email=email_to_use,
             is_active=True
         )
+        new_preference.sync_match_columns()
         
         db.session.add(new_preference)
         db.session.commit()
@@ -147,9 +172,8 @@ def update_shift_preference(preference_id):
             existing_preference.notification_email = data['notificationEmail']
         if 'isActive' in data:
             existing_preference.is_active = data['isActive']
+        existing_preference.sync_match_columns()
         
-        # Reset already_emailed flag when preference is updated so they can get new notifications
-        existing_preference.already_emailed = False
         existing_preference.updated_at = datetime.utcnow()
         db.session.commit()
 
@@ -221,256 +245,364 @@ def delete_shift_preference(preference_id):
 @shifts_bp.route('/check-shifts', methods=['GET'])
 @jwt_required()
 def check_shifts():
-    """Check for shifts"""
+    """Check for shifts, served from the checker's latest published scrape"""
     try:
         current_user_id = int(get_jwt_identity())
-        shifts = check_all_shifts()
+        snapshot = current_shifts(check_all_shifts)
         return jsonify({
-            'shifts': shifts
+            'shifts': serialize_days(snapshot.days),
+            'version': snapshot.version,
+            'publishedAt': snapshot.published_at.isoformat()
         })
     except Exception as e:
         print(f'Error checking shifts: {e}')
         return jsonify({'error': 'Failed to check shifts'}), 500
 
 
-def get_open_shifts_next_2_weeks(session, login_data, headers):
-    mapped_shift = 0 # all committees
+def get_open_shifts_next_2_weeks(session, login_data, headers, weeks=None, page_cache=None, committees=None):
+    """
+    Fetch and parse the open shifts grid for the next few weeks.
+
+    Week pages are requested concurrently through a bounded thread pool so the
+    total latency is roughly one page fetch instead of one per week. With a
+    page_cache, requests are conditional and unchanged pages aren't re-parsed.
+
+    Args:
+        session: Logged-in requests session
+        login_data: Login form data returned by login()
+        headers: Request headers returned by login()
+        weeks: Number of week pages to fetch (defaults to COOP_WEEKS_AHEAD)
+        page_cache: Optional PageCache to revalidate pages against
+        committees: Committee IDs to fetch pages for (defaults to all committees)
+
+    Returns:
+        list: Day dicts ({"day", "date", "shifts": [ShiftRecord]}) in date order
+    """
+    committees = committees or [ALL_COMMITTEES]
+    pages = shift_pages(weeks, committees)
+    urls = [url for _, url in pages]
+    responses = fetch_pages(session, urls, login_data, headers, page_cache)
+
+    days_by_committee = {committee_id: [] for committee_id in committees}
+    page_costs = []
+    for (committee_id, url), response in zip(pages, responses):
+        def timed_parse(html_content):
+            parse_started = time.perf_counter()
+            parsed_days = parse_shifts_page(html_content)
+            parse_seconds = time.perf_counter() - parse_started
+            page_costs.append((committee_id, len(response.content), parse_seconds))
+            metrics.increment('pages_parsed')
+            metrics.add_time('parse', parse_seconds)
+            return parsed_days
+
+        days = page_cache.cached_days(url, response) if page_cache else None
+        if days is None:
+            metrics.increment('page_bytes', len(response.content))
+            days = parse_once(response.text, timed_parse)
+            if page_cache:
+                page_cache.store(url, response, days)
+        # Pages come back in week order, so concatenating keeps days in date order
+        days_by_committee[committee_id].extend(days)
+
+    record_page_costs(page_costs)
+    if page_cache:
+        page_cache.save()
+
+    if len(committees) == 1:
+        return days_by_committee[committees[0]]
+    return merge_committee_days(days_by_committee.values())
+
+def merge_committee_days(committee_day_lists):
+    """Combine the day lists of several committee pages into one grid ordered by date and time"""
+    days_by_date = {}
+    for days in committee_day_lists:
+        for day_data in days:
+            merged = days_by_date.setdefault(day_data["date"], {
+                "day": day_data["day"],
+                "date": day_data["date"],
+                "shifts": []
+            })
+            merged["shifts"].extend(day_data["shifts"])
+
+    for merged in days_by_date.values():
+        unique_shifts = {shift.href: shift for shift in merged["shifts"]}
+        merged["shifts"] = sorted(unique_shifts.values(), key=lambda shift: shift.start_minute or 0)
+
+    return sorted(days_by_date.values(), key=lambda day_data: datetime.strptime(day_data["date"], '%m/%d/%Y'))
+
+def shift_pages(weeks=None, committees=None):
+    """(committee_id, url) of the grid pages for the next few weeks, grouped by committee"""
+    weeks = weeks or COOP_WEEKS_AHEAD
     # URL of the page to monitor
     today = datetime.now().strftime('%Y-%m-%d')
     shifts_path = "/services/shifts/"
-    shifts_by_day = []
-
-    # check 2 weeks out 
-    for i in range(2):
-        modifiers = f"{i}/{mapped_shift}/0/"
-        url = f"{COOP_BASEURL}{shifts_path}{modifiers}{today}"
-        print(url)
-
-        response = session.get(url, data=login_data, headers=headers)
-
-        html_content = response.text
-        soup = BeautifulSoup(html_content, 'html.parser')
-    
-        # Find the main grid container
-        grid_container = soup.find("div", class_="grid-container")
-
-        # Find all day columns within the grid container
-        columns = grid_container.find_all("div", class_="col") if grid_container else []
-
-        # Loop through each day's shifts
-        for col in columns:
-            # Extract date
-            date_element = col.find("p").find("b")
-            date_text = date_element.get_text(strip=True) if date_element else ""
-
-            # Check for "No shifts"
-            no_shifts = col.find("p", align="center")
-            if no_shifts and "-- No shifts --" in no_shifts.get_text():
-                shifts_by_day.append({
-                    "day": date_text.split()[0],  # Extract day (e.g., "Sun")
-                    "date": date_text.split()[1],  # Extract date (e.g., "3/16/2025")
-                    "shifts": []  # No shifts available
-                })
-                continue  # Skip further processing for this column
-
-            # Extract shift details
-            shifts = []
-            for shift in col.find_all("a", class_="shift"):
-                time_element = shift.find("b")  # Extract the bolded time
-                time_text = time_element.get_text(strip=True) if time_element else ""
-
-                # Extract remaining text (excluding time)
-                shift_description = shift.get_text(strip=True).replace(time_text, "").strip()
-
-                # Get the link
-                href = shift.get("href", "").strip()
-
-                # Store in dictionary format
-                shifts.append({
-                    "time": time_text,
-                    "description": shift_description,
-                    "href": f"{COOP_BASEURL}{href}"
-                })
-
-            # Store day's shifts
-            shifts_by_day.append({
-                "day": date_text.split()[0],  # Extract day (e.g., "Mon")
-                "date": date_text.split()[1],  # Extract date (e.g., "3/17/2025")
-                "shifts": shifts
-            })    
-
-    return shifts_by_day
-
-def check_all_shifts():
+    pages = []
+    for mapped_shift in committees or [ALL_COMMITTEES]:
+        for i in range(weeks):
+            modifiers = f"{i}/{mapped_shift}/0/"
+            pages.append((mapped_shift, f"{COOP_BASEURL}{shifts_path}{modifiers}{today}"))
+    return pages
+
+def shift_page_urls(weeks=None, committees=None):
+    """URLs of the grid pages for the next few weeks"""
+    return [url for _, url in shift_pages(weeks, committees)]
+
+def fetch_pages(session, urls, login_data, headers, page_cache=None):
+    """Fetch several pages concurrently, returning the responses in the order of urls"""
+    workers = max(1, min(COOP_FETCH_WORKERS, len(urls)))
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = []
+        for url in urls:
+            page_headers = {**headers, **page_cache.conditional_headers(url)} if page_cache else headers
+            futures.append(executor.submit(
+                session.get, url, data=login_data, headers=page_headers, timeout=(COOP_CONNECT_TIMEOUT, COOP_PAGE_TIMEOUT)
+            ))
+
+        # A page may take every retry the session allows, and with more pages
+        # than workers they're fetched in rounds, so the deadline covers both
+        deadline = math.ceil(len(urls) / workers) * request_deadline(COOP_PAGE_TIMEOUT)
+        done, not_done = wait(futures, timeout=deadline)
+        for url, future in zip(urls, futures):
+            if future in not_done:
+                raise TimeoutError(f'Timed out after {deadline}s fetching {url}')
+
+        responses = [future.result() for future in futures]
+        for url, response in zip(urls, responses):
+            # An error page would otherwise parse as a grid with no shifts
+            response.raise_for_status()
+            if is_login_redirect(response):
+                # Still bounced after logging in again; the login itself failed
+                raise RuntimeError(f'Redirected to the login page fetching {url}')
+        return responses
+    finally:
+        # Don't block on stragglers; their own socket timeout will end them
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def check_all_shifts(page_cache=None, committees=None):
     """Check all shifts for all users"""
-    session = requests.Session()
-    data, headers = login(session, os.getenv('COOP_USERNAME'), os.getenv('COOP_PASSWORD'))
-    open_shifts = get_open_shifts_next_2_weeks(session, data, headers)
+    session = get_coop_session(os.getenv('COOP_USERNAME'), os.getenv('COOP_PASSWORD'))
+    open_shifts = get_open_shifts_next_2_weeks(
+        session, session.login_data, session.login_headers,
+        page_cache=page_cache or PageCache(API_PAGE_CACHE_STATE),
+        committees=committees
+    )
     return open_shifts
 
+def check_fingerprint(page_cache, committees=None):
+    """Identify the inputs of a matching run: page contents plus preference edits"""
+    preferences_updated_at, preference_count = db.session.query(
+        func.max(ShiftPreference.updated_at),
+        func.count(ShiftPreference.id)
+    ).one()
+    urls = shift_page_urls(committees=committees)
+    return f'{page_cache.fingerprint(urls)}:{preferences_updated_at}:{preference_count}'
+
+def forget_last_check():
+    """Make the next check_all_users_shift_preferences() scrape and match in full"""
+    save_state(LAST_CHECK_STATE, {})
+    save_state(MATCH_STATE, {})
+
+def current_shift_keys(open_shifts, member_shifts=None):
+    """ShiftRecord.key()s of every scraped shift, as PreferenceIndex.match() expects for seen"""
+    keys = {shift.key() for day_data in open_shifts for shift in day_data["shifts"]}
+    for user_id, days in (member_shifts or {}).items():
+        keys.update(shift.key(user_id) for day_data in days for shift in day_data["shifts"])
+    return keys
+
+
+class CheckCheckpoint:
+    """
+    State a check run leaves for the next one, held back until its matches are queued.
 
-def login(session, user, pw):
-    # First we gotta find the CSRF token + cookie
-    session.get(COOP_BASEURL + "/services/login/")
-    csrf_token = session.cookies.get("csrftoken")  # Some sites store it in cookies
-    login_data = {
-        "username": user,
-        "password": pw,
-        "submit": "Log In",
-        "csrfmiddlewaretoken": csrf_token
-    }
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36",
-        "Referer": "https://members.foodcoop.com/services/login/",
-        "X-CSRFToken": csrf_token
+    Saving it earlier would let a crash between the check and the outbox
+    commit mark those matches as handled, so they'd never be sent.
+    """
+
+    def __init__(self):
+        self.states = {}
+
+    def save(self):
+        """Persist the state; call once the run's matches are committed"""
+        for name, data in self.states.items():
+            save_state(name, data)
+
+def remember_matched_shifts(checkpoint, shift_keys, watermark):
+    """Record what the next incremental check can skip"""
+    checkpoint.states[MATCH_STATE] = {
+        'shift_keys': sorted(shift_keys),
+        'watermark': watermark.isoformat() if watermark else None
     }
 
-    print(login_data)
+def active_preference_rows(*filters):
+    """
+    One streamed query for the active preferences of active users.
 
-    # Get the session loaded
-    session.post(COOP_BASEURL + "/services/login/", data=login_data, headers=headers)
-    return (login_data, headers)
+    Rows hold only what PreferenceIndex.from_rows() needs, ordered by user.
+    """
+    return db.session.query(
+        User.id.label('user_id'),
+        User.name.label('user_name'),
+        User.email.label('user_email'),
+        User.notification_email.label('user_notification_email'),
+        ShiftPreference.id,
+        ShiftPreference.shift_type,
+        ShiftPreference.days,
+        ShiftPreference.time_range_start,
+        ShiftPreference.time_range_end,
+        ShiftPreference.notification_email,
+        ShiftPreference.days_mask,
+        ShiftPreference.start_minute,
+        ShiftPreference.end_minute
+    ).select_from(ShiftPreference).join(User, ShiftPreference.user_id == User.id).filter(
+        User.is_active == True,
+        User.deleted_at.is_(None),
+        ShiftPreference.is_active == True,
+        *filters
+    ).order_by(User.id, ShiftPreference.id).execution_options(yield_per=PREFERENCE_BATCH_SIZE)
+
+def preference_prefilter(open_shifts, member_shifts=None):
+    """
+    SQL condition dropping preferences that can't match any scraped shift.
 
+    Compares days_mask against the weekdays that have shifts and the
+    preference's minutes against the span the shifts cover. Rows written
+    before the integer columns existed (NULL) always pass.
+    """
+    open_days_mask = 0
+    earliest_start, latest_end = None, None
+    for days in [open_shifts, *(member_shifts or {}).values()]:
+        for day_data in days:
+            for shift in day_data["shifts"]:
+                if shift.weekday is None or shift.start_minute is None:
+                    continue
+                open_days_mask |= 1 << shift.weekday
+                earliest_start = shift.start_minute if earliest_start is None else min(earliest_start, shift.start_minute)
+                latest_end = shift.end_minute if latest_end is None else max(latest_end, shift.end_minute)
+
+    if not open_days_mask:
+        return false()
+    return or_(
+        ShiftPreference.days_mask.is_(None),
+        and_(
+            ShiftPreference.days_mask.op('&')(open_days_mask) != 0,
+            ShiftPreference.start_minute < latest_end,
+            ShiftPreference.end_minute > earliest_start
+        )
+    )
 
 def found_shifts(shifts):
     return any(day["shifts"] for day in shifts)
 
-def check_all_users_shift_preferences():
-    """Iterate over all users and check if their shift preferences match available shifts"""
+def check_all_users_shift_preferences(only_if_changed=False, incremental=False):
+    """
+    Iterate over all users and check if their shift preferences match available shifts.
+
+    With only_if_changed, returns NO_CHANGE without matching when neither the
+    shift pages nor any preference changed since the last such check.
+
+    With incremental, only shifts that are new since the last incremental run
+    are matched against every preference, and the other shifts only against
+    preferences updated since then.
+
+    Returns:
+        tuple: (matches or NO_CHANGE, CheckCheckpoint). Callers save() the
+        checkpoint once the matches are committed to the outbox, and
+        forget_last_check() when they fail to, so they are found again.
+    """
+    checkpoint = CheckCheckpoint()
     try:
+        # Only download the committees that active preferences can match
+        plan = plan_from_preferences()
+        check_interval = note_check()
+        publishing = not plan.all_committees and publish_due(check_interval)
+        if publishing:
+            # Every so often take the full grid instead, for /check-shifts
+            plan = FetchPlan([ALL_COMMITTEES], 'published shifts snapshot is due a full grid')
+        metrics.record_decision('fetch_plan', plan.as_dict())
+
         # Get all available shifts
-        open_shifts = get_open_shifts_next_2_weeks(
-            requests.Session(), 
-            *login(requests.Session(), os.getenv('COOP_USERNAME'), os.getenv('COOP_PASSWORD'))
-        )
-        
-        # Get all active users with their shift preferences that haven't been emailed yet
-        users_with_preferences = db.session.query(User).join(ShiftPreference).filter(
-            User.is_active == True,
-            User.deleted_at.is_(None),
-            ShiftPreference.is_active == True,
-            ShiftPreference.already_emailed == False
-        ).distinct().all()
+        page_cache = PageCache()
+        open_shifts = check_all_shifts(page_cache, plan.committee_ids)
+        found_at = datetime.utcnow().isoformat()
+        if plan.all_committees:
+            # Only a full grid can stand in for /check-shifts' own scrape;
+            # per-committee plans are switched to one when publish_due()
+            publish_shifts(open_shifts)
+
+        # Shifts only visible to members' own accounts, by user ID
+        member_shifts = scrape_member_accounts(open_shifts, COOP_WEEKS_AHEAD) if COOP_MULTI_ACCOUNT else {}
+
+        # A publishing run's pages aren't the usual plan's, so it neither
+        # compares nor replaces the fingerprint the usual runs are matched by
+        if only_if_changed and not publishing:
+            fingerprint = f'{check_fingerprint(page_cache, plan.committee_ids)}:{member_shifts_digest(member_shifts)}'
+            if load_state(LAST_CHECK_STATE, {}).get('fingerprint') == fingerprint:
+                return NO_CHANGE, checkpoint
+            checkpoint.states[LAST_CHECK_STATE] = {
+                'fingerprint': fingerprint,
+                'checked_at': datetime.utcnow().isoformat()
+            }
+
+        # Record the scrape so later stages can work from what changed
+        delta = persist_snapshot(open_shifts, plan.committee_ids)
+        metrics.increment('shifts_appeared', delta.appeared_count)
+        metrics.increment('shifts_disappeared', len(delta.disappeared))
+
+        # Read the watermark before the preferences so later edits are seen next run
+        watermark = db.session.query(func.max(ShiftPreference.updated_at)).scalar()
+        shift_keys = current_shift_keys(open_shifts, member_shifts)
+        awaiting_seed = preferences_awaiting_seed()
+        # Seeding needs every match, so hold off incremental matching until it's done
+        previous = load_state(MATCH_STATE, {}) if incremental and not awaiting_seed else {}
+        seen, changed_ids = None, None
+        incremental_filters = []
+        if previous.get('shift_keys') is not None:
+            seen = shift_keys & set(previous['shift_keys'])
+            changed_since = datetime.fromisoformat(previous['watermark']) if previous.get('watermark') else datetime.min
+            changed_ids = {preference_id for (preference_id,) in db.session.query(ShiftPreference.id).filter(
+                ShiftPreference.updated_at > changed_since
+            )}
+            new_shift_count = len(shift_keys) - len(seen)
+            metrics.record_decision('incremental_match', {
+                'new_shifts': new_shift_count,
+                'changed_preferences': len(changed_ids)
+            })
+            if not new_shift_count and not changed_ids:
+                remember_matched_shifts(checkpoint, shift_keys, watermark)
+                return [], checkpoint
+            if not new_shift_count:
+                # Only changed preferences can match anything
+                incremental_filters.append(ShiftPreference.id.in_(changed_ids))
         
-        matches = []
+        # Stream the active preferences of active users in one query, skipping
+        # preferences whose days and hours can't overlap any scraped shift.
+        # Bucket them by weekday and shift type so each shift is only tested
+        # against preferences that could match it
+        index = PreferenceIndex.from_rows(active_preference_rows(
+            preference_prefilter(open_shifts, member_shifts),
+            *incremental_filters
+        ))
+        matches = index.match(open_shifts, member_shifts, seen, changed_ids)
+
+        if awaiting_seed:
+            matches = seed_ledger(matches, awaiting_seed)
+
+        # Drop shift/preference pairs that were already emailed
+        matches = unnotified_matches(matches)
+
+        # Stamp whose match it is and when the run saw the shifts, so they
+        # survive coalescing with other users' matches and can be timed
+        for user_match in matches:
+            for match in user_match['matches']:
+                match['user_id'] = user_match['user']['id']
+                match['found_at'] = found_at
+
+        if incremental:
+            remember_matched_shifts(checkpoint, shift_keys, watermark)
         
-        for user in users_with_preferences:
-            user_matches = []
-            
-            # Check each preference for this user
-            for preference in user.shift_preferences:
-                if not preference.is_active or preference.already_emailed:
-                    continue
-                    
-                preference_matches = []
-                
-                # Check against all available shifts
-                for day_data in open_shifts:
-                    day_name = day_data["day"]
-                    
-                    # Check if this day matches the user's preferred days
-                    if day_name in preference.days:
-                        for shift in day_data["shifts"]:
-                            # Check if shift type matches (case-insensitive partial match)
-                            if preference.shift_type.lower() in shift["description"].lower():
-                                # Parse shift time to check if it falls within preferred time range
-                                if is_time_in_range(shift["time"], preference.time_range_start, preference.time_range_end):
-                                    preference_matches.append({
-                                        "day": day_name,
-                                        "date": day_data["date"],
-                                        "shift": shift,
-                                        "matched_preference": {
-                                            "id": preference.id,
-                                            "shift_type": preference.shift_type,
-                                            "days": preference.days,
-                                            "time_range_start": preference.time_range_start,
-                                            "time_range_end": preference.time_range_end,
-                                            "notification_email": preference.notification_email
-                                        }
-                                    })
-                
-                if preference_matches:
-                    user_matches.extend(preference_matches)
-            
-            if user_matches:
-                matches.append({
-                    "user": {
-                        "id": user.id,
-                        "name": user.name,
-                        "email": user.email,
-                        "notification_email": user.notification_email
-                    },
-                    "matches": user_matches
-                })
-        
-        return matches
+        return matches, checkpoint
         
     except Exception as e:
         print(f'Error checking all users shift preferences: {e}')
         raise e
-
-def is_time_in_range(shift_time_str, start_time, end_time):
-    """
-    Check if a shift time falls within a user's preferred time range.
-    
-    Args:
-        shift_time_str: String like "5:00 PM - 10:00 PM" or "17:00 - 22:00"
-        start_time: String like "17:00"
-        end_time: String like "22:00"
-    
-    Returns:
-        bool: True if shift overlaps with preferred time range
-    """
-    try:
-        # Parse the shift time string to extract start and end times
-        if " - " in shift_time_str:
-            shift_start_str, shift_end_str = shift_time_str.split(" - ")
-            
-            # Convert 12-hour format to 24-hour if needed
-            shift_start_24 = convert_to_24_hour(shift_start_str.strip())
-            shift_end_24 = convert_to_24_hour(shift_end_str.strip())
-            
-            # Convert times to minutes for easier comparison
-            shift_start_minutes = time_to_minutes(shift_start_24)
-            shift_end_minutes = time_to_minutes(shift_end_24)
-            start_minutes = time_to_minutes(start_time)
-            end_minutes = time_to_minutes(end_time)
-            
-            # Check for overlap: shift overlaps if it starts before preference ends and ends after preference starts
-            return shift_start_minutes < end_minutes and shift_end_minutes > start_minutes
-            
-    except Exception as e:
-        print(f'Error parsing time range: {e}')
-        return False
-    
-    return False
-
-def convert_to_24_hour(time_str):
-    """Convert 12-hour format to 24-hour format"""
-    try:
-        if "AM" in time_str or "PM" in time_str:
-            # Parse 12-hour format
-            time_part = time_str.replace("AM", "").replace("PM", "").strip()
-            hour, minute = time_part.split(":")
-            hour = int(hour)
-            minute = int(minute)
-            
-            if "PM" in time_str and hour != 12:
-                hour += 12
-            elif "AM" in time_str and hour == 12:
-                hour = 0
-                
-            return f"{hour:02d}:{minute:02d}"
-        else:
-            # Already in 24-hour format
-            return time_str
-    except Exception:
-        return time_str
-
-def time_to_minutes(time_str):
-    """Convert time string (HH:MM) to minutes since midnight"""
-    try:
-        hour, minute = time_str.split(":")
-        return int(hour) * 60 + int(minute)
-    except Exception:
-        return 0
\ No newline at end of file
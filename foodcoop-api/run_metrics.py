@@ -0,0 +1,94 @@
+"""
+Metrics for a single shift check run.
+
+Stages record counters, timings, per-item samples and decisions on the
+module-level `metrics` object; the run prints a one-line JSON summary at the end and, when
+COOP_METRICS_FILE is set, appends it there as well.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+load_dotenv()
+COOP_METRICS_FILE = os.getenv('COOP_METRICS_FILE')
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of a sorted, non-empty list"""
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def distribution(values):
+    ordered = sorted(values)
+    return {
+        'count': len(ordered),
+        'p50': round(percentile(ordered, 50), 4),
+        'p90': round(percentile(ordered, 90), 4),
+        'p99': round(percentile(ordered, 99), 4),
+        'max': round(ordered[-1], 4)
+    }
+
+
+class RunMetrics:
+    """Thread-safe counters, timings and decisions for one run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = datetime.utcnow()
+            self._started = time.perf_counter()
+            self.counters = {}
+            self.timings = {}
+            self.samples = {}
+            self.decisions = {}
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_time(self, name, seconds):
+        """Accumulate seconds spent in a stage"""
+        with self._lock:
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def observe(self, name, value):
+        """Record one sample (e.g. one message's latency); summarized as percentiles"""
+        with self._lock:
+            self.samples.setdefault(name, []).append(value)
+
+    def record_decision(self, name, decision):
+        """Record a JSON-serializable description of a choice the run made"""
+        with self._lock:
+            self.decisions[name] = decision
+
+    def summary(self):
+        with self._lock:
+            return {
+                'started_at': self.started_at.isoformat(),
+                'duration': round(time.perf_counter() - self._started, 4),
+                'counters': dict(self.counters),
+                'timings': {name: round(seconds, 4) for name, seconds in self.timings.items()},
+                'distributions': {name: distribution(values) for name, values in self.samples.items()},
+                'decisions': dict(self.decisions)
+            }
+
+    def log(self):
+        """Print the run summary and append it to COOP_METRICS_FILE if configured"""
+        line = json.dumps(self.summary())
+        print(f'Run metrics: {line}')
+        if COOP_METRICS_FILE:
+            try:
+                with open(COOP_METRICS_FILE, 'a') as f:
+                    f.write(line + '\n')
+            except OSError as e:
+                print(f'Error writing metrics to {COOP_METRICS_FILE}: {e}')
+
+
+metrics = RunMetrics()
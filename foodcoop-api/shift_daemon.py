@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Resident shift checker.
+
+Replaces the once-a-minute cron job: the process stays up, so the Flask app,
+the database connection pool and the logged-in coop session stay warm between
+checks. Checks run at the tightest UserSettings.check_frequency among active
+users, speed up while the grid is changing and ease back off once it's quiet.
+Notification emails are sent from the outbox by a dispatcher thread.
+"""
+
+import os
+import re
+import signal
+import sys
+import threading
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Add the API directory to Python path so we can import modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Load environment variables
+load_dotenv()
+
+from app import app
+from models import db, User, UserSettings, ShiftPreference
+from check_shifts_cron import run_check
+from email_outbox import start_dispatcher
+from run_metrics import metrics
+
+DEFAULT_CHECK_FREQUENCY = '5min'
+COOP_MIN_POLL_SECONDS = float(os.getenv('COOP_MIN_POLL_SECONDS', 30))  # Fastest polling while the grid changes
+FREQUENCY_UNITS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'hr': 3600}
+FREQUENCY_PATTERN = re.compile(r'^\s*(\d+)\s*([a-z]+?)s?\s*$')
+SPEED_UP = 0.5  # Interval multiplier after a run that saw the grid change
+SLOW_DOWN = 1.5  # Interval multiplier after a quiet run
+
+
+def parse_check_frequency(value):
+    """Convert a check_frequency like "5min", "1hour" or "30s" to seconds"""
+    match = FREQUENCY_PATTERN.match((value or '').lower())
+    if not match or match.group(2) not in FREQUENCY_UNITS:
+        match = FREQUENCY_PATTERN.match(DEFAULT_CHECK_FREQUENCY)
+    return int(match.group(1)) * FREQUENCY_UNITS[match.group(2)]
+
+def tightest_check_frequency():
+    """Shortest check interval, in seconds, wanted by any user with active preferences"""
+    frequencies = db.session.query(UserSettings.check_frequency).select_from(User).join(ShiftPreference).outerjoin(UserSettings).filter(
+        User.is_active == True,
+        User.deleted_at.is_(None),
+        ShiftPreference.is_active == True
+    ).distinct().all()
+    if not frequencies:
+        return parse_check_frequency(DEFAULT_CHECK_FREQUENCY)
+    # Users without settings get the default frequency
+    return min(parse_check_frequency(frequency or DEFAULT_CHECK_FREQUENCY) for (frequency,) in frequencies)
+
+
+class AdaptivePoller:
+    """Picks the delay before the next check from how recent checks went"""
+
+    def __init__(self, floor=COOP_MIN_POLL_SECONDS):
+        self.floor = floor
+        self.base = None
+        self.interval = None
+
+    def set_base(self, base):
+        """Use base as the slowest interval (the users' tightest check_frequency)"""
+        self.base = max(base, self.floor)
+        if self.interval is None or self.interval > self.base:
+            self.interval = self.base
+
+    def record(self, grid_changed):
+        """Adjust the interval after a check and return it"""
+        if grid_changed:
+            self.interval = max(self.floor, self.interval * SPEED_UP)
+        else:
+            self.interval = min(self.base, self.interval * SLOW_DOWN)
+        return self.interval
+
+
+def run_forever(stop_event):
+    poller = AdaptivePoller()
+    while not stop_event.is_set():
+        grid_changed = False
+        try:
+            with app.app_context():
+                poller.set_base(tightest_check_frequency())
+            run_check(dispatch=False)
+            grid_changed = bool(metrics.counters.get('shifts_appeared') or metrics.counters.get('shifts_disappeared'))
+        except Exception as e:
+            print(f"[{datetime.now()}] Shift check failed: {e}")
+        finally:
+            # Give pooled connections back between checks
+            with app.app_context():
+                db.session.remove()
+
+        interval = poller.record(grid_changed)
+        print(f"[{datetime.now()}] Next check in {interval:.0f}s ({'grid changing' if grid_changed else 'grid quiet'})")
+        stop_event.wait(interval)
+
+def main():
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_event.set())
+
+    print(f"[{datetime.now()}] Shift checker daemon started")
+    # Slow SMTP never holds up the next check
+    start_dispatcher(app, stop_event)
+    run_forever(stop_event)
+    print(f"[{datetime.now()}] Shift checker daemon stopped")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Parsers for the coop shift grid page.
+
+Every backend returns the same list of day dicts:
+    [{"day": "Mon", "date": "3/17/2025", "shifts": [ShiftRecord, ...]}]
+
+Backends:
+    html.parser - BeautifulSoup with the pure-Python parser over the whole page
+    strainer    - BeautifulSoup that only builds the div.grid-container subtree
+    lxml        - lxml (C) parser starting at the grid container (fastest)
+
+The backend is picked with COOP_PARSER and falls back to html.parser when
+lxml isn't installed. A page without the grid container raises
+GridNotFoundError rather than parsing as a week with no shifts.
+"""
+
+import os
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+from dotenv import load_dotenv
+from shift_record import ShiftRecord
+
+try:
+    import lxml.html
+except ImportError:  # lxml is optional, html.parser always works
+    lxml = None
+
+load_dotenv()
+COOP_BASEURL = os.getenv('COOP_BASEURL', 'https://members.foodcoop.com')
+DEFAULT_BACKEND = os.getenv('COOP_PARSER', 'lxml')
+
+GRID_START = re.compile(r'<div\b[^>]*\bclass=["\'][^"\']*\bgrid-container\b')
+NO_SHIFTS_TEXT = "-- No shifts --"
+
+
+class GridNotFoundError(ValueError):
+    """The page has no shift grid, e.g. the login page of an expired session"""
+
+
+def has_class(class_name):
+    """XPath predicate matching elements with class_name among their classes"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+def is_grid_container(class_value):
+    """SoupStrainer class test; the container may carry other classes too"""
+    return bool(class_value) and "grid-container" in class_value.split()
+
+def day_entry(date_text, shifts):
+    """Build a day dict from its heading and (time, description, href) tuples"""
+    day = date_text.split()[0]  # Extract day (e.g., "Mon")
+    date = date_text.split()[1]  # Extract date (e.g., "3/17/2025")
+    return {
+        "day": day,
+        "date": date,
+        "shifts": [ShiftRecord(time, description, href, day, date) for time, description, href in shifts]
+    }
+
+def parse_with_soup(html_content, base_url, strainer=False):
+    """Parse with BeautifulSoup, optionally only building the grid container"""
+    parse_only = SoupStrainer("div", class_=is_grid_container) if strainer else None
+    soup = BeautifulSoup(html_content, 'html.parser', parse_only=parse_only)
+    shifts_by_day = []
+
+    # Find the main grid container
+    grid_container = soup.find("div", class_="grid-container")
+
+    if grid_container is None:
+        raise GridNotFoundError('No grid container on the shifts page')
+
+    # Find all day columns within the grid container
+    columns = grid_container.find_all("div", class_="col")
+
+    # Loop through each day's shifts
+    for col in columns:
+        # Extract date
+        date_element = col.find("p").find("b")
+        date_text = date_element.get_text(strip=True) if date_element else ""
+
+        # Check for "No shifts"
+        no_shifts = col.find("p", align="center")
+        if no_shifts and NO_SHIFTS_TEXT in no_shifts.get_text():
+            shifts_by_day.append(day_entry(date_text, []))
+            continue  # Skip further processing for this column
+
+        # Extract shift details
+        shifts = []
+        for shift in col.find_all("a", class_="shift"):
+            time_element = shift.find("b")  # Extract the bolded time
+            time_text = time_element.get_text(strip=True) if time_element else ""
+
+            # Extract remaining text (excluding time)
+            shift_description = shift.get_text(strip=True).replace(time_text, "").strip()
+
+            # Get the link
+            href = shift.get("href", "").strip()
+
+            shifts.append((time_text, shift_description, f"{base_url}{href}"))
+
+        shifts_by_day.append(day_entry(date_text, shifts))
+
+    return shifts_by_day
+
+def stripped_text(element):
+    """Equivalent of BeautifulSoup's get_text(strip=True)"""
+    return ''.join(text.strip() for text in element.itertext())
+
+def parse_with_lxml(html_content, base_url):
+    """Parse with lxml, skipping everything before the grid container"""
+    match = GRID_START.search(html_content)
+    document = lxml.html.document_fromstring(html_content[match.start():] if match else html_content)
+    grid_containers = document.xpath(f"//div[{has_class('grid-container')}]")
+    if not grid_containers:
+        raise GridNotFoundError('No grid container on the shifts page')
+
+    shifts_by_day = []
+    for col in grid_containers[0].xpath(f".//div[{has_class('col')}]"):
+        date_element = col.find(".//p").find(".//b")
+        date_text = stripped_text(date_element) if date_element is not None else ""
+
+        no_shifts = col.find(".//p[@align='center']")
+        if no_shifts is not None and NO_SHIFTS_TEXT in ''.join(no_shifts.itertext()):
+            shifts_by_day.append(day_entry(date_text, []))
+            continue
+
+        shifts = []
+        for shift in col.xpath(f".//a[{has_class('shift')}]"):
+            time_element = shift.find(".//b")
+            time_text = stripped_text(time_element) if time_element is not None else ""
+            shifts.append((
+                time_text,
+                stripped_text(shift).replace(time_text, "").strip(),
+                f"{base_url}{shift.get('href', '').strip()}"
+            ))
+
+        shifts_by_day.append(day_entry(date_text, shifts))
+
+    return shifts_by_day
+
+BACKENDS = {
+    'html.parser': lambda html_content, base_url: parse_with_soup(html_content, base_url),
+    'strainer': lambda html_content, base_url: parse_with_soup(html_content, base_url, strainer=True),
+    'lxml': parse_with_lxml,
+}
+
+def available_backends():
+    """Names of the backends usable in this environment"""
+    return [name for name in BACKENDS if name != 'lxml' or lxml is not None]
+
+def parse_shifts_page(html_content, base_url=COOP_BASEURL, backend=None):
+    """
+    Parse one week of the shifts grid into day dicts.
+
+    Args:
+        html_content: Page body
+        base_url: Prefix for the relative shift links
+        backend: Backend name (defaults to COOP_PARSER)
+
+    Raises:
+        GridNotFoundError: The page has no grid container
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in available_backends():
+        backend = 'html.parser'
+    return BACKENDS[backend](html_content, base_url)
@@ -0,0 +1,76 @@
+"""
+Compact record for one scraped shift.
+
+The time string is parsed once, when the page is parsed, so matching, the
+email renderer and the API don't re-parse "5:00 PM - 10:00 PM" over and over.
+Days stay plain dicts ({"day", "date", "shifts"}) whose "shifts" hold records.
+"""
+
+from shift_times import shift_minutes, weekday_index
+
+
+class ShiftRecord:
+    """
+    One open shift.
+
+    start_minute/end_minute are minutes since midnight (None when the time
+    can't be parsed), weekday is 0-6 for Monday-Sunday.
+    """
+
+    __slots__ = (
+        'time', 'description', 'href', 'day', 'date',
+        'weekday', 'start_minute', 'end_minute', 'description_lower'
+    )
+
+    def __init__(self, time, description, href, day, date):
+        self.time = time
+        self.description = description
+        self.href = href
+        self.day = day
+        self.date = date
+        self.weekday = weekday_index(day)
+        self.start_minute, self.end_minute = shift_minutes(time) or (None, None)
+        self.description_lower = description.lower()
+
+    def key(self, user_id=None):
+        """Identity of the shift between runs, per user for members' own shifts"""
+        key = f'{self.date} {self.time} {self.href}'
+        return key if user_id is None else f'{user_id}:{key}'
+
+    def to_dict(self):
+        """The shift as the API and page cache have always represented it"""
+        return {"time": self.time, "description": self.description, "href": self.href}
+
+    def __eq__(self, other):
+        if not isinstance(other, ShiftRecord):
+            return NotImplemented
+        return (self.time, self.description, self.href, self.day, self.date) == \
+            (other.time, other.description, other.href, other.day, other.date)
+
+    def __hash__(self):
+        return hash((self.href, self.date, self.time))
+
+    def __repr__(self):
+        return f'ShiftRecord({self.day} {self.date} {self.time!r} {self.description!r})'
+
+
+def serialize_days(days):
+    """Day dicts with ShiftRecords -> JSON-ready day dicts"""
+    return [
+        {"day": day_data["day"], "date": day_data["date"], "shifts": [shift.to_dict() for shift in day_data["shifts"]]}
+        for day_data in days
+    ]
+
+def deserialize_days(data):
+    """The inverse of serialize_days()"""
+    return [
+        {
+            "day": day_data["day"],
+            "date": day_data["date"],
+            "shifts": [
+                ShiftRecord(shift["time"], shift["description"], shift["href"], day_data["day"], day_data["date"])
+                for shift in day_data["shifts"]
+            ]
+        }
+        for day_data in data
+    ]
@@ -0,0 +1,145 @@
+"""
+Persist each scrape into available_shifts and report what changed.
+
+Shifts are keyed on their sign-up link (or date + time + description when a
+shift has no link of its own). Each scrape is applied as a handful of bulk
+statements: new shifts are inserted, shifts that came back are re-opened and
+shifts that are no longer listed are marked is_available=False.
+"""
+
+import os
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import or_
+from committees import ALL_COMMITTEES, committee_id_for_description
+from models import db, AvailableShift
+
+load_dotenv()
+COOP_BASEURL = os.getenv('COOP_BASEURL', 'https://members.foodcoop.com')
+
+
+def iso_date(grid_date):
+    """Convert a grid date like "3/17/2025" to "2025-03-17" """
+    return datetime.strptime(grid_date, '%m/%d/%Y').strftime('%Y-%m-%d')
+
+def identity_key(href, date, time, description):
+    """Key identifying one shift across scrapes"""
+    if href and href.rstrip('/') != COOP_BASEURL.rstrip('/'):
+        return href
+    return f'{date} {time} {description}'
+
+def shift_key(day_data, shift):
+    return identity_key(shift.href, iso_date(day_data["date"]), shift.time, shift.description)
+
+def row_key(row):
+    return identity_key(row.href, row.date, row.time, row.shift_type)
+
+def shift_starts_at(date, shift):
+    """When a shift begins, from its "2025-03-17" date and parsed start time"""
+    day = datetime.strptime(date, '%Y-%m-%d')
+    if shift.start_minute is None:
+        return day
+    return day + timedelta(minutes=shift.start_minute)
+
+def shift_expires_at(date, shift):
+    """When a shift is over, from its "2025-03-17" date and parsed end time"""
+    day = datetime.strptime(date, '%Y-%m-%d')
+    if shift.end_minute is None:
+        return day + timedelta(days=1)
+    return day + timedelta(minutes=shift.end_minute)
+
+
+class ShiftDelta:
+    """
+    What changed since the previous scrape.
+
+    appeared: Day dicts in the scrape's shape holding only new shifts
+    disappeared: Dicts describing shifts that are no longer listed
+    """
+
+    def __init__(self, appeared, disappeared):
+        self.appeared = appeared
+        self.disappeared = disappeared
+
+    @property
+    def appeared_count(self):
+        return sum(len(day_data["shifts"]) for day_data in self.appeared)
+
+    @property
+    def has_changes(self):
+        return bool(self.appeared_count or self.disappeared)
+
+
+def persist_snapshot(open_shifts, committees=None):
+    """
+    Upsert a scrape into available_shifts and return the ShiftDelta.
+
+    Args:
+        open_shifts: Day dicts from get_open_shifts_next_2_weeks()
+        committees: Committee IDs the scrape covered. Shifts of other
+            committees weren't looked at, so they are never marked gone.
+    """
+    now = datetime.utcnow()
+    scraped = {}
+    for day_data in open_shifts:
+        for shift in day_data["shifts"]:
+            scraped[shift_key(day_data, shift)] = (day_data, shift)
+
+    hrefs = [shift.href for _, shift in scraped.values()]
+    known_rows = AvailableShift.query.filter(or_(
+        AvailableShift.is_available == True,
+        AvailableShift.href.in_(hrefs)
+    )).all()
+    rows_by_key = {row_key(row): row for row in known_rows}
+
+    covered = None if not committees or ALL_COMMITTEES in committees else set(committees)
+    appeared_keys = {key for key in scraped if key not in rows_by_key or not rows_by_key[key].is_available}
+    disappeared_rows = [
+        row for key, row in rows_by_key.items()
+        if row.is_available and key not in scraped and (covered is None or row.shift_type_id in covered)
+    ]
+
+    new_rows = []
+    reopened_ids = []
+    for key, (day_data, shift) in scraped.items():
+        if key not in appeared_keys:
+            continue
+        if key in rows_by_key:
+            reopened_ids.append(rows_by_key[key].id)
+            continue
+        date = iso_date(day_data["date"])
+        new_rows.append({
+            'shift_type': shift.description,
+            'shift_type_id': committee_id_for_description(shift.description),
+            'day': day_data["day"],
+            'date': date,
+            'time': shift.time,
+            'href': shift.href,
+            'is_available': True,
+            'found_at': now,
+            'expires_at': shift_expires_at(date, shift)
+        })
+
+    if new_rows:
+        db.session.execute(db.insert(AvailableShift), new_rows)
+    if reopened_ids:
+        db.session.execute(db.update(AvailableShift).where(AvailableShift.id.in_(reopened_ids)).values(
+            is_available=True,
+            found_at=now
+        ))
+    if disappeared_rows:
+        db.session.execute(db.update(AvailableShift).where(
+            AvailableShift.id.in_([row.id for row in disappeared_rows])
+        ).values(is_available=False))
+    db.session.commit()
+
+    appeared = []
+    for day_data in open_shifts:
+        new_shifts = [shift for shift in day_data["shifts"] if shift_key(day_data, shift) in appeared_keys]
+        if new_shifts:
+            appeared.append({"day": day_data["day"], "date": day_data["date"], "shifts": new_shifts})
+    disappeared = [
+        {'day': row.day, 'date': row.date, 'time': row.time, 'description': row.shift_type, 'href': row.href}
+        for row in disappeared_rows
+    ]
+    return ShiftDelta(appeared, disappeared)
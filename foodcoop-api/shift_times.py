@@ -0,0 +1,103 @@
+"""Parsing of shift and preference times"""
+
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+def weekday_index(day_name):
+    """0-6 (Monday-Sunday) for "Mon" or "Monday", or None if unrecognized"""
+    try:
+        return WEEKDAYS.index(day_name.strip()[:3].lower())
+    except (AttributeError, ValueError):
+        return None
+
+def days_mask(day_names):
+    """Bitmask of weekdays (bit 0 = Monday) for ["Monday", "Wed"], unknown names ignored"""
+    mask = 0
+    for day_name in day_names or []:
+        weekday = weekday_index(day_name)
+        if weekday is not None:
+            mask |= 1 << weekday
+    return mask
+
+def mask_weekdays(mask):
+    """The weekday indexes set in a days_mask"""
+    return [weekday for weekday in range(len(WEEKDAYS)) if mask & (1 << weekday)]
+
+def shift_minutes(shift_time_str):
+    """
+    (start, end) minutes since midnight for "5:00 PM - 10:00 PM", or None.
+
+    Parses exactly like is_time_in_range() so both agree on every shift.
+    """
+    parts = shift_time_str.split(" - ")
+    if len(parts) != 2:
+        return None
+    return (
+        time_to_minutes(convert_to_24_hour(parts[0].strip())),
+        time_to_minutes(convert_to_24_hour(parts[1].strip()))
+    )
+
+def is_time_in_range(shift_time_str, start_time, end_time):
+    """
+    Check if a shift time falls within a user's preferred time range.
+    
+    Args:
+        shift_time_str: String like "5:00 PM - 10:00 PM" or "17:00 - 22:00"
+        start_time: String like "17:00"
+        end_time: String like "22:00"
+    
+    Returns:
+        bool: True if shift overlaps with preferred time range
+    """
+    try:
+        # Parse the shift time string to extract start and end times
+        if " - " in shift_time_str:
+            shift_start_str, shift_end_str = shift_time_str.split(" - ")
+            
+            # Convert 12-hour format to 24-hour if needed
+            shift_start_24 = convert_to_24_hour(shift_start_str.strip())
+            shift_end_24 = convert_to_24_hour(shift_end_str.strip())
+            
+            # Convert times to minutes for easier comparison
+            shift_start_minutes = time_to_minutes(shift_start_24)
+            shift_end_minutes = time_to_minutes(shift_end_24)
+            start_minutes = time_to_minutes(start_time)
+            end_minutes = time_to_minutes(end_time)
+            
+            # Check for overlap: shift overlaps if it starts before preference ends and ends after preference starts
+            return shift_start_minutes < end_minutes and shift_end_minutes > start_minutes
+            
+    except Exception as e:
+        print(f'Error parsing time range: {e}')
+        return False
+    
+    return False
+
+def convert_to_24_hour(time_str):
+    """Convert 12-hour format to 24-hour format"""
+    try:
+        if "AM" in time_str or "PM" in time_str:
+            # Parse 12-hour format
+            time_part = time_str.replace("AM", "").replace("PM", "").strip()
+            hour, minute = time_part.split(":")
+            hour = int(hour)
+            minute = int(minute)
+            
+            if "PM" in time_str and hour != 12:
+                hour += 12
+            elif "AM" in time_str and hour == 12:
+                hour = 0
+                
+            return f"{hour:02d}:{minute:02d}"
+        else:
+            # Already in 24-hour format
+            return time_str
+    except Exception:
+        return time_str
+
+def time_to_minutes(time_str):
+    """Convert time string (HH:MM) to minutes since midnight"""
+    try:
+        hour, minute = time_str.split(":")
+        return int(hour) * 60 + int(minute)
+    except Exception:
+        return 0
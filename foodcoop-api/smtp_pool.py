@@ -0,0 +1,132 @@
+"""
+Pool of authenticated SMTP connections shared by a run's emails.
+
+Connecting, STARTTLS and logging in cost several round trips, so they are
+done once per connection instead of once per message. A connection that
+drops (or sat idle long enough for the server to have dropped it) is
+replaced and the message retried once on a fresh one.
+"""
+
+import os
+import queue
+import smtplib
+import threading
+import time
+from dotenv import load_dotenv
+from run_metrics import metrics
+
+load_dotenv()
+SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
+SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
+SMTP_USERNAME = os.getenv('SMTP_USERNAME')
+SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
+SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', 2))  # Connections kept open
+SMTP_MAX_IDLE = float(os.getenv('SMTP_MAX_IDLE', 60))  # Seconds before an idle connection is replaced
+SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', 30))
+
+# Failures that mean the connection is gone rather than the message was refused
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+class PooledConnection:
+    def __init__(self, server):
+        self.server = server
+        self.last_used = time.monotonic()
+
+
+class SmtpPool:
+    """At most `size` logged-in SMTP connections, borrowed one message at a time"""
+
+    def __init__(self, server=SMTP_SERVER, port=SMTP_PORT, username=SMTP_USERNAME,
+                 password=SMTP_PASSWORD, size=SMTP_POOL_SIZE):
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+
+    @property
+    def configured(self):
+        return bool(self.username and self.password)
+
+    def _connect(self, metrics):
+        server = smtplib.SMTP(self.server, self.port, timeout=SMTP_TIMEOUT)
+        try:
+            server.starttls()
+            server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        metrics.increment('email_connections_opened')
+        return PooledConnection(server)
+
+    def _checkout(self, metrics):
+        while True:
+            try:
+                connection = self.idle.get_nowait()
+            except queue.Empty:
+                return self._connect(metrics)
+            if time.monotonic() - connection.last_used < SMTP_MAX_IDLE:
+                metrics.increment('email_connection_reuses')
+                return connection
+            self._discard(connection)
+
+    def _discard(self, connection):
+        try:
+            connection.server.quit()
+        except Exception:
+            connection.server.close()
+
+    def send(self, from_email, to_email, message, metrics=metrics):
+        """
+        Send one message (bytes), reconnecting once if the connection dropped.
+
+        Connections opened, reused and replaced are counted in metrics, the
+        sender's RunMetrics (the pool itself is shared by every run).
+        """
+        with self.slots:
+            for attempt in range(2):
+                connection = self._checkout(metrics)
+                try:
+                    connection.server.sendmail(from_email, [to_email], message)
+                except CONNECTION_ERRORS:
+                    self._discard(connection)
+                    if attempt:
+                        raise
+                    metrics.increment('email_reconnects')
+                    continue
+                except Exception:
+                    # The message was refused; reset the transaction and keep the connection
+                    try:
+                        connection.server.rset()
+                        self._checkin(connection)
+                    except Exception:
+                        self._discard(connection)
+                    raise
+                self._checkin(connection)
+                break
+
+    def _checkin(self, connection):
+        connection.last_used = time.monotonic()
+        self.idle.put(connection)
+
+    def close(self):
+        """Log out of every idle connection"""
+        while True:
+            try:
+                self._discard(self.idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def smtp_pool():
+    """The process-wide pool, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SmtpPool()
+        return _pool
@@ -0,0 +1,46 @@
+"""
+Small JSON state files shared between the API server and the shift checker.
+
+Each piece of state lives in its own file under COOP_STATE_DIR and is written
+atomically, so a reader in another process never sees a half-written file.
+"""
+
+import json
+import os
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv()
+STATE_DIR = os.getenv(
+    'COOP_STATE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.state')
+)
+
+def state_path(name):
+    """Return the path of the file backing the named state"""
+    return os.path.join(STATE_DIR, f'{name}.json')
+
+def load_state(name, default=None):
+    """Load the named state, or return default if it doesn't exist or is unreadable"""
+    try:
+        with open(state_path(name)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as e:
+        print(f'Error loading state {name}: {e}')
+        return default
+
+def save_state(name, data):
+    """Atomically replace the named state with data"""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=STATE_DIR, prefix=f'.{name}.')
+    try:
+        # State can hold session cookies, so keep it private to this user
+        os.chmod(tmp_path, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, state_path(name))
+    except Exception:
+        os.unlink(tmp_path)
+        raise
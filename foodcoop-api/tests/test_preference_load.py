@@ -0,0 +1,107 @@
+"""
+The preference loader must cost one query however many preferences there are.
+
+Runs against in-memory SQLite; shift_preferences is created by hand because
+its days column is a Postgres ARRAY, which the loader doesn't read anyway
+once days_mask is set.
+"""
+
+import os
+import sys
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import db, User
+from preference_index import PreferenceIndex
+from routes.shifts import active_preference_rows, preference_prefilter
+from shift_record import ShiftRecord
+from shift_times import days_mask
+
+SHIFTS = [{
+    "day": "Mon",
+    "date": "3/17/2025",
+    "shifts": [ShiftRecord("5:00 PM - 7:45 PM", "Receiving", "https://example.com/shift/1", "Mon", "3/17/2025")]
+}]
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        User.__table__.create(db.engine)
+        db.session.execute(db.text("""
+            CREATE TABLE shift_preferences (
+                id INTEGER PRIMARY KEY, user_id INTEGER, shift_type TEXT, days TEXT,
+                time_range_start TEXT, time_range_end TEXT, notification_email TEXT,
+                is_active BOOLEAN, created_at TIMESTAMP, updated_at TIMESTAMP,
+                already_emailed BOOLEAN, needs_ledger_seed BOOLEAN,
+                days_mask INTEGER, start_minute INTEGER, end_minute INTEGER
+            )
+        """))
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+def seed(user_count, preferences_per_user):
+    """Users with Monday evening Receiving preferences, plus one Sunday morning one each"""
+    db.session.add_all([
+        User(id=user_id, email=f'user{user_id}@example.com', name=f'User {user_id}', password='x',
+             notification_email=f'user{user_id}@example.com', is_active=True)
+        for user_id in range(1, user_count + 1)
+    ])
+    rows = []
+    for user_id in range(1, user_count + 1):
+        for n in range(preferences_per_user):
+            rows.append({'user_id': user_id, 'shift_type': 'Receiving', 'mask': days_mask(['Monday']), 'start': 17 * 60, 'end': 22 * 60})
+        rows.append({'user_id': user_id, 'shift_type': 'Receiving', 'mask': days_mask(['Sunday']), 'start': 6 * 60, 'end': 9 * 60})
+    db.session.execute(db.text("""
+        INSERT INTO shift_preferences (user_id, shift_type, days, time_range_start, time_range_end,
+            notification_email, is_active, days_mask, start_minute, end_minute)
+        VALUES (:user_id, :shift_type, '', '', '', '', 1, :mask, :start, :end)
+    """), rows)
+    db.session.commit()
+
+
+def count_queries(fn):
+    queries = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        result = fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return result, queries
+
+
+@pytest.mark.parametrize('user_count, preferences_per_user', [(1, 1), (20, 5), (300, 10)])
+def test_preferences_load_in_one_query(app, user_count, preferences_per_user):
+    seed(user_count, preferences_per_user)
+
+    index, queries = count_queries(
+        lambda: PreferenceIndex.from_rows(active_preference_rows(preference_prefilter(SHIFTS)))
+    )
+
+    assert len(queries) == 1
+    # The Sunday morning preferences can't match a Monday evening shift
+    assert len(index.preferences) == user_count * preferences_per_user
+    assert len(index.users) == user_count
+
+
+def test_prefilter_keeps_preferences_without_match_columns(app):
+    seed(2, 1)
+    db.session.execute(db.text("UPDATE shift_preferences SET days_mask = NULL WHERE days_mask = :mask"), {'mask': days_mask(['Sunday'])})
+    db.session.commit()
+
+    index = PreferenceIndex.from_rows(active_preference_rows(preference_prefilter(SHIFTS)))
+
+    assert len(index.preferences) == 4
@@ -0,0 +1,49 @@
+"""Every parser backend must read the sample grid pages the same way"""
+
+import glob
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shift_parser import COOP_BASEURL, GridNotFoundError, lxml, parse_shifts_page, parse_with_lxml, parse_with_soup
+
+SAMPLES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'samples', '*.html')))
+BACKENDS = {
+    'strainer': lambda html: parse_with_soup(html, COOP_BASEURL, strainer=True),
+    'lxml': lambda html: parse_with_lxml(html, COOP_BASEURL),
+}
+
+
+def read_sample(path, extra_class=False):
+    with open(path) as f:
+        html = f.read()
+    if extra_class:
+        html = html.replace('class="grid-container"', 'class="grid-container week"')
+    return html
+
+
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+@pytest.mark.parametrize('extra_class', [False, True])
+@pytest.mark.parametrize('path', SAMPLES, ids=os.path.basename)
+def test_backend_matches_html_parser(path, extra_class, backend):
+    if backend == 'lxml' and lxml is None:
+        pytest.skip('lxml is not installed')
+    html = read_sample(path, extra_class)
+
+    expected = parse_with_soup(html, COOP_BASEURL)
+
+    assert expected
+    assert BACKENDS[backend](html) == expected
+
+
+@pytest.mark.parametrize('backend', ['html.parser', *sorted(BACKENDS)])
+def test_page_without_grid_raises(backend):
+    if backend == 'lxml' and lxml is None:
+        pytest.skip('lxml is not installed')
+    login_page = '<html><body><form action="/services/login/"><input name="username"></form></body></html>'
+
+    with pytest.raises(GridNotFoundError):
+        parse_shifts_page(login_page, backend=backend)
@@ -0,0 +1,36 @@
+"""The automaton must find exactly the types a substring test would"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from type_matcher import TypeMatcher
+
+DESCRIPTIONS = [
+    '',
+    'receiving: lifting 🚚',
+    'receiving: stocking 📦',
+    '** cashier 💵',
+    'checkout 💳',
+    'case maintenance 🧽',
+    'food processing',
+]
+TYPE_SETS = [
+    ['receiving', 'lifting', 'stocking', 'cashier'],
+    ['receiving: lifting', 'lifting', 'ing', 'g'],
+    ['he', 'she', 'his', 'hers', 'checkout'],
+    [''],
+    ['', 'cashier'],
+    [' ', 'case'],
+]
+
+
+@pytest.mark.parametrize('tokens', TYPE_SETS, ids=repr)
+def test_find_matches_substring_test(tokens):
+    matcher = TypeMatcher(tokens)
+
+    for description in DESCRIPTIONS:
+        assert matcher.find(description) == {token for token in tokens if token in description}
@@ -0,0 +1,91 @@
+"""
+Multi-pattern substring matching of shift types against shift descriptions.
+
+An Aho-Corasick automaton over all distinct lowercased shift types finds
+every type occurring in a description in one pass over its characters,
+however many types there are. Automatons are cached by their set of types,
+so one is only rebuilt when the preferences' shift types change.
+"""
+
+import threading
+from collections import OrderedDict
+
+AUTOMATON_CACHE_SIZE = 8
+FOUND_CACHE_SIZE = 4096  # Distinct descriptions remembered per automaton
+
+
+class TypeMatcher:
+    """Aho-Corasick automaton over a fixed set of lowercase shift types"""
+
+    def __init__(self, tokens):
+        self.tokens = frozenset(tokens)
+        self.goto = [{}]  # state -> character -> next state
+        self.fail = [0]
+        self.output = [()]  # state -> tokens ending at this state
+        self._found = {}  # description -> tokens found, descriptions repeat a lot
+        for token in sorted(self.tokens):
+            self._insert(token)
+        self._link()
+
+    def _insert(self, token):
+        state = 0
+        for char in token:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(())
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.output[state] += (token,)
+
+    def _link(self):
+        """Breadth-first failure links, merging outputs along them"""
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] += self.output[self.fail[next_state]]
+
+    def find(self, description):
+        """The tokens occurring in a lowercased description, as a frozenset"""
+        found = self._found.get(description)
+        if found is not None:
+            return found
+        # An empty type sits on the root and occurs in every description,
+        # as '' in description always is
+        matches = set(self.output[0])
+        state = 0
+        for char in description:
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            if self.output[state]:
+                matches.update(self.output[state])
+        found = frozenset(matches)
+        if len(self._found) >= FOUND_CACHE_SIZE:
+            self._found.clear()
+        self._found[description] = found
+        return found
+
+
+_automatons = OrderedDict()  # frozenset of tokens -> TypeMatcher
+_automatons_lock = threading.Lock()
+
+def type_matcher(tokens):
+    """The cached automaton for these shift types, built on first use"""
+    key = frozenset(tokens)
+    with _automatons_lock:
+        matcher = _automatons.get(key)
+        if matcher is not None:
+            _automatons.move_to_end(key)
+            return matcher
+    matcher = TypeMatcher(key)
+    with _automatons_lock:
+        _automatons[key] = matcher
+        while len(_automatons) > AUTOMATON_CACHE_SIZE:
+            _automatons.popitem(last=False)
+    return matcher
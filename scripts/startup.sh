@@ -33,15 +33,15 @@ screen -S foodcoop -X screen -t api zsh -c "source /Users/jonkalfayan/Developer/
 echo "Starting React frontend server..."
 screen -S foodcoop -X screen -t frontend zsh -c "cd /Users/jonkalfayan/Developer/foodcoop/foodcoop-react && npm run dev; exec zsh"
 
+# Add a new window for the resident shift checker
+# (replaces the old once-a-minute cron job, which is removed if still installed)
+echo "Starting shift checker daemon..."
+crontab -l 2>/dev/null | grep -v check_shifts_cron.py | crontab -
+screen -S foodcoop -X screen -t checker zsh -c "source /Users/jonkalfayan/Developer/foodcoop/.venv/bin/activate && cd /Users/jonkalfayan/Developer/foodcoop/foodcoop-api && python shift_daemon.py 2>&1 | tee -a /tmp/foodcoop_shifts.log; exec zsh"
+
 # Set window titles for better organization
 screen -S foodcoop -p 0 -X title "postgres"
 
-# Set up cron job for shift checking
-echo "Setting up cron job for shift checking..."
-API_DIR="/Users/jonkalfayan/Developer/foodcoop/foodcoop-api"
-(crontab -l 2>/dev/null | grep -v check_shifts_cron.py; echo "* * * * * cd $API_DIR && /Users/jonkalfayan/Developer/foodcoop/.venv/bin/python3 check_shifts_cron.py >> /tmp/foodcoop_shifts.log 2>&1") | crontab -
-echo "Cron job added successfully!"
-
 echo ""
 echo "All services started! Here's how to manage them:"
 echo ""
@@ -52,6 +52,7 @@ echo "Once attached, navigate between windows:"
 echo "  Ctrl+A, then 0  # PostgreSQL window"
 echo "  Ctrl+A, then 1  # Python API window"
 echo "  Ctrl+A, then 2  # React frontend window"
+echo "  Ctrl+A, then 3  # Shift checker window"
 echo "  Ctrl+A, then n  # Next window"
 echo "  Ctrl+A, then p  # Previous window"
 echo "  Ctrl+A, then \"  # List all windows"
@@ -61,10 +62,9 @@ echo ""
 echo "Stop all services:"
 echo "  ./scripts/shutdown.sh"
 echo ""
-echo "Shift checking cron job:"
-echo "  Runs every 15 minutes automatically"
+echo "Shift checker daemon:"
+echo "  Checks at the tightest user check frequency, faster while shifts are changing"
 echo "  Logs to: /tmp/foodcoop_shifts.log"
 echo "  View logs: tail -f /tmp/foodcoop_shifts.log"
-echo "  Remove cron: crontab -l | grep -v check_shifts_cron.py | crontab -"
 echo ""
 echo "Development environment is ready!"
\ No newline at end of file